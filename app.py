@@ -1,10 +1,10 @@
 import streamlit as st
 import os
-from dotenv import load_dotenv
 import datetime
+import importlib.util
 import matplotlib.pyplot as plt
-import random
-from langdetect import detect, DetectorFactory
+import re
+import uuid
 
 # -----------------------
 # Custom CSS Styling
@@ -195,19 +195,28 @@ def apply_custom_styles():
 # Voice Configuration
 # -----------------------
 try:
-    from utils.voice_io import speak_text, record_voice, VOICE_AVAILABLE
+    from utils.voice_io import speak_text, speak_stream, record_voice, tts_worker, VOICE_AVAILABLE
 except ImportError:
     VOICE_AVAILABLE = False
+    tts_worker = None
     def speak_text(text, language='en') -> None:
         pass
-    def record_voice():
+    def speak_stream(language='en'):
+        return None
+    def record_voice(timeout=5, phrase_time_limit=10, language='en'):
         return ""
 
+try:
+    from utils.audio_transcription import transcribe_upload, UPLOAD_AUDIO_TYPES, TRANSCRIPTION_AVAILABLE
+except ImportError:
+    TRANSCRIPTION_AVAILABLE = False
+
 # -----------------------
 # Load Environment
 # -----------------------
-load_dotenv()
-api_key = os.getenv("GENAI_API_KEY")
+from utils.resources import registry, get_api_key, get_vectorstore, get_llm
+
+api_key = get_api_key()
 
 if not api_key:
     st.error("❌ Gemini API Key not found. Please set GENAI_API_KEY in your .env file")
@@ -217,8 +226,10 @@ if not api_key:
 # SIMPLIFIED IMPORTS (No Agents)
 # -----------------------
 try:
-    from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-    from langchain_community.vectorstores import Chroma
+    # Shared clients are built lazily in utils.resources; fail early if missing
+    for package in ("langchain_google_genai", "langchain_community"):
+        if importlib.util.find_spec(package) is None:
+            raise ImportError(f"No module named '{package}'")
     
     # ✅ CORRECT Memory import
     try:
@@ -228,18 +239,8 @@ try:
             from langchain_community.chat_message_histories import ChatMessageHistory
             from langchain_community import ConversationBufferMemory
         except ImportError:
-            # Final fallback - create a simple memory class
-            class ConversationBufferMemory:
-                def __init__(self, memory_key="chat_history", return_messages=True):
-                    self.memory_key = memory_key
-                    self.return_messages = return_messages
-                    self.chat_memory = type('obj', (object,), {'messages': []})()
-                
-                def save_context(self, inputs, outputs):
-                    if not hasattr(self.chat_memory, 'messages'):
-                        self.chat_memory.messages = []
-                    self.chat_memory.messages.append(type('obj', (object,), {'type': 'human', 'content': list(inputs.values())[0]})())
-                    self.chat_memory.messages.append(type('obj', (object,), {'type': 'ai', 'content': list(outputs.values())[0]})())
+            # Final fallback - compact memory with the same interface
+            from utils.memory_store import CompactMemory as ConversationBufferMemory
                     
 except ImportError as e:
     st.error(f"❌ Import Error: {e}")
@@ -259,23 +260,32 @@ try:
 except ImportError:
     IMAGE_AVAILABLE = False
 
+from utils.tip_cache import tip_cache
+from utils.memory_store import get_memory_store
+from utils.summarizer import conversation_summarizer, fit_history_to_budget
+from utils.response_cache import response_cache
+from utils.write_queue import vector_write_queue
+from utils.language_detection import detect_language
+from utils.intent_router import route_intent
+from utils.response_pools import response_pools
+from utils.batch_generation import generate_batch, generate_per_language
+from utils.history_view import history_window, page_html
+from utils.retrieval import user_context_retriever
+from utils.maintenance import start_maintenance_scheduler
+
 # -----------------------
 # Memory Management
 # -----------------------
-persist_dir = "./db/chroma"
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=api_key)
-
+# Embeddings, Chroma client and LLM are built once per process and shared
 try:
-    vectorstore = Chroma(
-        collection_name="mental_wellness_chat",
-        embedding_function=embeddings,
-        persist_directory=persist_dir
-    )
+    vectorstore = get_vectorstore()
 except Exception as e:
     st.warning(f"ChromaDB initialization warning: {e}")
     vectorstore = None
 
-DetectorFactory.seed = 0
+# Retention/compaction in the background when MAINTENANCE_INTERVAL_HOURS is set
+if vectorstore:
+    start_maintenance_scheduler()
 
 # -----------------------
 # Language Configuration
@@ -301,7 +311,7 @@ language_names = {
 # -----------------------
 # Enhanced LLM Prompt System
 # -----------------------
-def create_contextual_prompt(user_input, language, context_type, conversation_history=None) -> str:
+def create_contextual_prompt(user_input, language, context_type, conversation_history=None, history_summary=None, personal_context=None) -> str:
     """Create dynamic prompts for different contexts"""
     
     base_instructions = {
@@ -360,12 +370,18 @@ def create_contextual_prompt(user_input, language, context_type, conversation_hi
     context_instruction = context_prompts[context_type].get(language, context_prompts[context_type]['en'])
     # Build conversation history context
     history_context = ""
-    if conversation_history:
+    if conversation_history or history_summary:
         history_context = "\n\nPrevious conversation:\n"
-        for msg in conversation_history[-6:]:  # Last 3 exchanges
-            if hasattr(msg, 'type') and hasattr(msg, 'content'):
-                role = "User" if msg.type == "human" else "Assistant"
-                history_context += f"{role}: {msg.content}\n"
+        if history_summary:
+            history_context += f"Summary of earlier conversation: {history_summary}\n"
+        # Last 3 exchanges, clipped to the history token budget
+        for role, content in fit_history_to_budget((conversation_history or [])[-6:], summary=history_summary):
+            history_context += f"{role}: {content}\n"
+    
+    # Relevant entries from the user's own mood check-ins and journal
+    if personal_context:
+        history_context += "\n\nRelevant notes from the user's past check-ins and journal entries:\n"
+        history_context += "".join(f"- {snippet}\n" for snippet in personal_context)
     
     prompt = f"""{base_instruction}
 
@@ -379,68 +395,247 @@ Please respond in {language_names.get(language, 'English')} language with approp
     return prompt
 
 def detect_user_language(text):
-    """Detect language from user input"""
-    try:
-        return detect(text)
-    except:
-        return 'en'
+    """Detect language from user input (None when the input has no letters, e.g. only emoji)"""
+    return detect_language(text)
+
+def build_llm_prompt(user_input, language, context_type, memory=None, user_id=None):
+    """Build the full LLM prompt for a user message and context"""
+    # Get conversation history (rolling summary + recent turns) if memory exists
+    conversation_history = []
+    history_summary = ""
+    if memory and hasattr(memory, 'chat_memory') and hasattr(memory.chat_memory, 'messages'):
+        history_summary, conversation_history = conversation_summarizer.get_context(user_id, memory.chat_memory.messages)
+    
+    # Create a more specific prompt based on context type
+    if context_type == 'mood_analysis':
+        # For mood analysis, use the actual user input
+        prompt_text = user_input
+    elif context_type == 'mindfulness':
+        # For mindfulness, be more specific
+        prompt_text = f"The user wants a mindfulness exercise. {user_input}" if user_input else "Provide a practical mindfulness exercise"
+    elif context_type == 'motivation':
+        # For motivation, be more specific  
+        prompt_text = f"The user needs motivation. {user_input}" if user_input else "Provide an inspiring motivational message"
+    elif context_type == 'journal':
+        # For journal, be more specific
+        prompt_text = f"The user wants a journal prompt. {user_input}" if user_input else "Provide a thoughtful journaling prompt"
+    else:
+        prompt_text = user_input
+    
+    # Personal context from the user's stored entries (skipped if too slow)
+    personal_context = user_context_retriever.retrieve(user_id, user_input) if user_id else []
+    
+    return create_contextual_prompt(prompt_text, language, context_type, conversation_history, history_summary, personal_context)
 
-def get_llm_response(user_input, language, context_type, llm, memory=None):
+def save_exchange(memory, user_input, response, llm):
+    """Save an exchange to memory and refresh the rolling summary in the background"""
+    user_id = st.session_state.get('user_id')
+    if user_id:
+        # Write through the store: the memory fetched for this run may have been evicted since
+        memory = user_memories.save_context(user_id, {"input": user_input}, {"output": response})
+    else:
+        memory.save_context({"input": user_input}, {"output": response})
+    if hasattr(memory, 'chat_memory') and hasattr(memory.chat_memory, 'messages'):
+        conversation_summarizer.schedule_update(user_id, memory.chat_memory.messages, llm)
+
+# -----------------------
+# Pre-generated Response Pools
+# -----------------------
+QUICK_FEELINGS = ["😊 Happy & Content", "😢 Sad & Low", "😰 Anxious & Worried", "😠 Frustrated & Angry", "😴 Tired & Drained", "😌 Calm & Peaceful", "🎉 Excited & Energetic"]
+MINDFULNESS_PROMPT = "Provide a personalized mindfulness or meditation exercise"
+BREATHING_PROMPT = "Provide a breathing exercise for deep relaxation and stress relief"
+JOURNAL_PROMPT = "Provide an insightful journaling prompt for self-reflection and personal growth"
+MOTIVATION_PROMPT = "Provide personalized motivational encouragement and inspiration"
+
+POOLED_PROMPTS = [
+    (MINDFULNESS_PROMPT, 'mindfulness'),
+    (BREATHING_PROMPT, 'mindfulness'),
+    (JOURNAL_PROMPT, 'journal'),
+    (MOTIVATION_PROMPT, 'motivation')
+] + [(feeling, 'mood_analysis') for feeling in QUICK_FEELINGS]
+
+# Warm every language up front instead of only the session's language
+WARM_ALL_POOL_LANGUAGES = os.getenv("WARM_ALL_POOL_LANGUAGES", "false").lower() == "true"
+
+def generate_pool_responses(user_input, language, context_type, count):
+    """Generate `count` varied responses for a pooled prompt in one call (errors propagate)"""
+    llm = get_llm()
+    prompt = build_llm_prompt(user_input, language, context_type)
+    if count == 1:
+        return [llm.invoke(prompt).content]
+    return generate_batch(llm, prompt, count)
+
+for pooled_prompt, pooled_context in POOLED_PROMPTS:
+    response_pools.register(pooled_prompt, pooled_context, supported_languages.values())
+response_pools.generator = generate_pool_responses
+
+def get_cached_response(user_input, language, context_type):
+    """Serve a shared prompt from the pre-generated pools, then the response cache"""
+    return (response_pools.take(user_input, language, context_type)
+            or response_cache.lookup(user_input, language, context_type))
+
+def get_llm_response(user_input, language, context_type, llm, memory=None, use_cache=False, user_id=None):
     """Get response from LLM in specified language and context"""
     try:
-        # Get conversation history if memory exists
-        conversation_history = []
-        if memory and hasattr(memory, 'chat_memory') and hasattr(memory.chat_memory, 'messages'):
-            conversation_history = memory.chat_memory.messages
+        # Shared prompts (quick moods, fixed buttons) can be served from pools or the cache
+        cached = get_cached_response(user_input, language, context_type) if use_cache else None
+        if cached:
+            if memory:
+                save_exchange(memory, user_input, cached, llm)
+            return cached
         
-        # Create a more specific prompt based on context type
-        if context_type == 'mood_analysis':
-            # For mood analysis, use the actual user input
-            prompt_text = user_input
-        elif context_type == 'mindfulness':
-            # For mindfulness, be more specific
-            prompt_text = f"The user wants a mindfulness exercise. {user_input}" if user_input else "Provide a practical mindfulness exercise"
-        elif context_type == 'motivation':
-            # For motivation, be more specific  
-            prompt_text = f"The user needs motivation. {user_input}" if user_input else "Provide an inspiring motivational message"
-        elif context_type == 'journal':
-            # For journal, be more specific
-            prompt_text = f"The user wants a journal prompt. {user_input}" if user_input else "Provide a thoughtful journaling prompt"
+        # Cached responses are shared across users, so they are generated without personal context
+        if use_cache:
+            prompt = build_llm_prompt(user_input, language, context_type)
         else:
-            prompt_text = user_input
-        
-        prompt = create_contextual_prompt(prompt_text, language, context_type, conversation_history)
+            prompt = build_llm_prompt(user_input, language, context_type, memory, user_id)
         
         response = llm.invoke(prompt)
         
+        if use_cache:
+            response_cache.store(user_input, language, context_type, response.content)
+        
         # Save to memory
         if memory:
-            memory.save_context({"input": user_input}, {"output": response.content})
+            save_exchange(memory, user_input, response.content, llm)
         
         return response.content
         
     except Exception as e:
-        # Fallback response in appropriate language
-        fallback_responses = {
-            'en': "I understand you're reaching out for support. Let me help you with that. Could you please share a bit more about how you're feeling?",
-            'hi': "मैं समझता हूं कि आप सहायता के लिए संपर्क कर रहे हैं। मुझे आपकी मदद करने दें। क्या आप कृपया थोड़ा और बता सकते हैं कि आप कैसा महसूस कर रहे हैं?",
-            'mr': "मी समजतो की तुम्हाला आधारासाठी संपर्क करत आहात. मला तुमची मदत करू द्या. कृपया तुम्हाला कसे वाटत आहे ते थोडे अधिक सांगू शकता?",
-            'es': "Entiendo que estás buscando apoyo. Permíteme ayudarte con eso. ¿Podrías compartir un poco más sobre cómo te sientes?",
-            'fr': "Je comprends que vous cherchez du soutien. Permettez-moi de vous aider avec cela. Pourriez-vous s'il vous plaît partager un peu plus sur ce que vous ressentez ?",
-            'de': "Ich verstehe, dass Sie Unterstützung suchen. Lassen Sie mich Ihnen dabei helfen. Könnten Sie bitte etwas mehr darüber teilen, wie Sie sich fühlen?"
-        }
-        return fallback_responses.get(language, fallback_responses['en'])
+        return get_fallback_response(language)
+
+def _chunk_text(chunk):
+    """Extract plain text from a streamed message chunk"""
+    content = getattr(chunk, 'content', chunk)
+    if isinstance(content, str):
+        return content
+    # Some chat models stream a list of content parts
+    return "".join(part if isinstance(part, str) else part.get('text', '') for part in content)
+
+def stream_llm_response(user_input, language, context_type, llm, memory=None, use_cache=False, user_id=None):
+    """Stream the LLM response chunk by chunk, saving the full answer to memory"""
+    cached = get_cached_response(user_input, language, context_type) if use_cache else None
+    if cached:
+        yield cached
+        if memory:
+            save_exchange(memory, user_input, cached, llm)
+        return
+    
+    parts = []
+    try:
+        # Cached responses are shared across users, so they are generated without personal context
+        if use_cache:
+            prompt = build_llm_prompt(user_input, language, context_type)
+        else:
+            prompt = build_llm_prompt(user_input, language, context_type, memory, user_id)
+        
+        for chunk in llm.stream(prompt):
+            text = _chunk_text(chunk)
+            if text:
+                parts.append(text)
+                yield text
+                
+    except Exception as e:
+        print(f"LLM stream failed: {e}")
+        if not parts:
+            yield get_fallback_response(language)
+        else:
+            # A truncated answer is shown as interrupted and never saved as complete
+            yield "\n\n⚠️ *The response was interrupted. Please try again.*"
+        return
+    
+    if use_cache and parts:
+        response_cache.store(user_input, language, context_type, "".join(parts))
+    
+    # Save the completed answer to memory
+    if memory and parts:
+        save_exchange(memory, user_input, "".join(parts), llm)
+
+def render_streamed_response(chunks, speech=None):
+    """
+    Render streamed chunks incrementally in a custom card and return the full text.
+    If a speech stream is given, each sentence is spoken as soon as it arrives.
+    """
+    placeholder = st.empty()
+    response = ""
+    try:
+        for text in chunks:
+            response += text
+            if speech is not None:
+                speech.feed(text)
+            placeholder.markdown(f'<div class="custom-card">{response}▌</div>', unsafe_allow_html=True)
+    finally:
+        if speech is not None:
+            speech.close()
+    placeholder.markdown(f'<div class="custom-card">{response}</div>', unsafe_allow_html=True)
+    return response
+
+def voice_stream(enable_voice_responses, language):
+    """Speech stream for a streamed response, or None when voice responses are off"""
+    if VOICE_AVAILABLE and enable_voice_responses:
+        return speak_stream(language)
+    return None
+
+def get_fallback_response(language):
+    """Fallback response in appropriate language"""
+    fallback_responses = {
+        'en': "I understand you're reaching out for support. Let me help you with that. Could you please share a bit more about how you're feeling?",
+        'hi': "मैं समझता हूं कि आप सहायता के लिए संपर्क कर रहे हैं। मुझे आपकी मदद करने दें। क्या आप कृपया थोड़ा और बता सकते हैं कि आप कैसा महसूस कर रहे हैं?",
+        'mr': "मी समजतो की तुम्हाला आधारासाठी संपर्क करत आहात. मला तुमची मदत करू द्या. कृपया तुम्हाला कसे वाटत आहे ते थोडे अधिक सांगू शकता?",
+        'es': "Entiendo que estás buscando apoyo. Permíteme ayudarte con eso. ¿Podrías compartir un poco más sobre cómo te sientes?",
+        'fr': "Je comprends que vous cherchez du soutien. Permettez-moi de vous aider avec cela. Pourriez-vous s'il vous plaît partager un peu plus sur ce que vous ressentez ?",
+        'de': "Ich verstehe, dass Sie Unterstützung suchen. Lassen Sie mich Ihnen dabei helfen. Könnten Sie bitte etwas mehr darüber teilen, wie Sie sich fühlen?"
+    }
+    return fallback_responses.get(language, fallback_responses['en'])
+
+DAILY_TIP_PROMPT = "Provide a brief, practical daily wellness tip or self-care reminder that is personalized and actionable"
+DAILY_TIP_BATCH_PROMPT = f"You are a compassionate mental wellness assistant. {DAILY_TIP_PROMPT}. Keep it warm, empathetic and under 80 words."
+
+def get_daily_tip(language, llm, user_id=None):
+    """Get today's wellness tip from the shared tip cache"""
+    def _generate():
+        # One call produces today's tip for every supported language
+        try:
+            tips = generate_per_language(llm, DAILY_TIP_BATCH_PROMPT, language_names)
+        except Exception as e:
+            print(f"Batched daily tip generation failed, generating {language} only: {e}")
+            tips = {}
+        for code, tip in tips.items():
+            other_key = tip_cache.make_key(code, user_id)
+            if code != language and tip_cache.peek(other_key) is None:
+                tip_cache.put(other_key, tip)
+        if language in tips:
+            return tips[language]
+        # Errors propagate so a fallback message is never cached
+        prompt = build_llm_prompt(DAILY_TIP_PROMPT, language, 'motivation')
+        return llm.invoke(prompt).content
+    
+    try:
+        return tip_cache.get(tip_cache.make_key(language, user_id), _generate)
+    except Exception as e:
+        print(f"Daily tip unavailable, using fallback: {e}")
+        return get_fallback_response(language)
 
-user_memories = {}
+# Bounded LRU/TTL store shared across sessions, spilling to SQLite on eviction
+user_memories = get_memory_store(ConversationBufferMemory)
+# A memory rebuilt from disk is renumbered, so its old summary no longer lines up
+user_memories.add_load_listener(conversation_summarizer.reset)
+
+def get_or_create_user_id():
+    """
+    Return the visitor's id, kept in the URL so a returning visit (reload or
+    bookmark) gets its saved history back. Ids are random UUIDs, so one user
+    can't stumble onto another's history; anything else in the URL is replaced.
+    """
+    user_id = st.query_params.get("uid", "")
+    if not re.fullmatch(r"user_[0-9a-f]{32}", user_id):
+        user_id = f"user_{uuid.uuid4().hex}"
+        st.query_params["uid"] = user_id
+    return user_id
 
 def get_user_memory(user_id):
     """Get or create conversation memory for a user"""
-    if user_id not in user_memories:
-        user_memories[user_id] = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
-    return user_memories[user_id]
+    return user_memories.get(user_id)
 
 def execute_wellness_tool(query, user_input, memory, llm=None, language='en', context_type='general'):
     """Execute wellness tools with multilingual LLM support"""
@@ -453,23 +648,12 @@ def execute_wellness_tool(query, user_input, memory, llm=None, language='en', co
                 current_language = detected_lang
                 st.session_state.current_language = detected_lang
         
-        # Determine context type based on query
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["mood", "feeling", "feel", "emotion", "emotional"]):
-            context_type = 'mood_analysis'
-        elif any(word in query_lower for word in ["mindfulness", "meditation", "exercise", "breathe", "calm", "relax"]):
-            context_type = 'mindfulness'
-        elif any(word in query_lower for word in ["motivation", "quote", "inspire", "encouragement", "positive"]):
-            context_type = 'motivation'
-        elif any(word in query_lower for word in ["journal", "prompt", "write", "reflect", "reflection"]):
-            context_type = 'journal'
-        else:
-            context_type = 'general'
+        # Determine context type based on query (single pass, all supported languages)
+        context_type = route_intent(query).context_type
         
         # Use LLM for all responses
         if llm:
-            response = get_llm_response(query, current_language, context_type, llm, memory)
+            response = get_llm_response(query, current_language, context_type, llm, memory, user_id=st.session_state.get('user_id'))
         else:
             # Fallback to English if no LLM
             response = "I'm here to support your mental wellness. Please try again."
@@ -529,10 +713,26 @@ with st.sidebar:
     elif enable_voice and not VOICE_AVAILABLE:
         st.warning("Voice not available")
     
+    # Shared resource health
+    with st.expander("🩺 System Health"):
+        # Backend probes only run on request, not on every rerun
+        probe = st.button("🔍 Check Connections", key="check_resources_btn")
+        for name, status in registry.health(probe=probe).items():
+            if status['error']:
+                st.error(f"{name}: {status['error']}")
+            elif status['initialized']:
+                st.success(f"{name}: {'healthy' if status['healthy'] else 'ready'}")
+            else:
+                st.info(f"{name}: not loaded")
+        if tts_worker is not None:
+            tts = tts_worker.stats()
+            st.caption(f"🔊 Speech queue: {tts['queue_depth']} waiting, {tts['synthesis_backlog']} chunks to synthesize, "
+                       f"{tts['spoken']} spoken, {tts['cancelled']} cancelled, {tts['dropped']} dropped")
+    
     # Initialize session
 if not st.session_state.initialized:
         if st.button("🚀 Start Journey", use_container_width=True, type="primary"):
-            user_id = f"user_{random.randint(1000, 9999)}"
+            user_id = get_or_create_user_id()
             
             st.session_state.user_id = user_id
             st.session_state.initialized = True
@@ -544,17 +744,15 @@ if not st.session_state.initialized:
             # Initialize user session
             memory = get_user_memory(user_id)
             
-            # Initialize LLM 
-            llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                temperature=0.7, 
-                google_api_key=api_key
-            )
+            # Shared LLM client (one connection pool for all sessions)
+            llm = get_llm()
             
-            # Store in session state
-            st.session_state.memory = memory
+            # Store in session state (memory itself lives in the shared store)
             st.session_state.llm = llm
             
+            # Pre-generate pooled responses in the background
+            response_pools.warm(None if WARM_ALL_POOL_LANGUAGES else [st.session_state.current_language])
+            
             st.balloons()
             st.success("Ready to begin!")
             st.rerun()
@@ -562,10 +760,341 @@ if not st.session_state.initialized:
 
     
 
+# -----------------------
+# Page Sections (Fragments)
+# -----------------------
+# Each tab and panel is a fragment: interacting with a widget inside it
+# reruns only that function instead of the whole script.
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+@fragment
+def render_mood_checkin_tab(memory, llm, enable_voice_responses):
+    """Daily mood check-in tab"""
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.markdown('<h2 style="color: #1f3a60; text-align: center; margin: 0px 0;">🌈 How Are You Feeling Today?</h2>', unsafe_allow_html=True)
+    # Language info
+    current_language = st.session_state.current_language
+    if st.session_state.auto_detect:
+        st.markdown(f'<div class="info-box">🌐 Auto-detect: ON | Current: {language_names.get(current_language, "English")}</div>', unsafe_allow_html=True)
+    else:
+        st.markdown(f'<div class="info-box">🌐 Language: {language_names.get(current_language, "English")}</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.markdown('<h4 style="color: #1f3a60;">🎤 Share Your Feelings</h4>', unsafe_allow_html=True)
+        mode = st.radio("Choose input method:", ["Text", "Voice", "Upload"], horizontal=True, key="mood_input_mode")
+        mood_input = ""
+        
+        if mode == "Text":
+            mood_input = st.text_area(
+                "Tell me about your day...",
+                placeholder="I'm feeling... happy/sad/anxious/excited/tired/etc.\nWhat's on your mind?",
+                height=120,
+                key="mood_text_input"
+            )
+        elif mode == "Voice":
+            if VOICE_AVAILABLE:
+                if st.button("🎤 Start Voice Recording", use_container_width=True, key="voice_record_btn"):
+                    mood_input = record_voice(language=st.session_state.current_language)
+                if mood_input:
+                    st.success("✅ Voice recorded successfully!")
+                    st.write(f"**You said:** {mood_input}")
+            else:
+                st.warning("🎧 Voice input not available in this environment")
+        else:
+            if TRANSCRIPTION_AVAILABLE:
+                audio_file = st.file_uploader(
+                    "Upload a voice note or voice journal",
+                    type=UPLOAD_AUDIO_TYPES,
+                    key="mood_audio_upload"
+                )
+                if audio_file is not None:
+                    # Transcripts are kept per file so they survive the rerun from "Analyze"
+                    upload_key = f"{audio_file.name}:{audio_file.size}"
+                    transcripts = st.session_state.setdefault('upload_transcripts', {})
+                    if upload_key not in transcripts and st.button("📝 Transcribe Recording", use_container_width=True, key="transcribe_upload_btn"):
+                        progress = st.empty()
+                        try:
+                            update = None
+                            for update in transcribe_upload(audio_file, language=st.session_state.current_language):
+                                progress.info(f"📝 {update.text or 'Transcribing...'}")
+                            transcripts[upload_key] = update.text if update else ""
+                            if update and update.failed:
+                                st.warning(f"{update.failed} of {update.total} parts of the recording could not be transcribed, so the text may be incomplete.")
+                        except (ValueError, RuntimeError) as e:
+                            st.warning(str(e))
+                        progress.empty()
+                    mood_input = transcripts.get(upload_key, "")
+                    if upload_key in transcripts and not mood_input:
+                        st.warning("Could not understand the audio. Please try another recording.")
+                    elif mood_input:
+                        st.success("✅ Recording transcribed!")
+                        st.write(f"**You said:** {mood_input}")
+            else:
+                st.warning("🎧 Audio upload needs pydub and SpeechRecognition")
+    
+    with col2:
+        st.markdown('<h4 style="color: #1f3a60;">⚡ Quick Emotions</h4>', unsafe_allow_html=True)
+        selected_feeling = st.selectbox("Select your current mood:", [""] + QUICK_FEELINGS, key="quick_feelings_select")
+        
+        if selected_feeling:
+            mood_input = selected_feeling
+            st.info(f"Selected: {selected_feeling}")
+    
+    # Mood check button
+    if st.button("🔍 Analyze My Mood & Get Support", type="primary", use_container_width=True, key="analyze_mood_btn"):
+        if mood_input:
+            # Auto-detect language if enabled
+            current_language = st.session_state.current_language
+            if st.session_state.auto_detect:
+                detected_lang = detect_user_language(mood_input)
+                if detected_lang in supported_languages.values():
+                    current_language = detected_lang
+                    st.session_state.current_language = detected_lang
+            
+            status = st.empty()
+            with st.spinner("🔮 Analyzing your emotions and preparing personalized support..."):
+                render_streamed_response(stream_llm_response(
+                    mood_input, 
+                    current_language, 
+                    'mood_analysis', 
+                    llm, 
+                    memory,
+                    use_cache=(mood_input == selected_feeling),
+                    user_id=st.session_state.user_id
+                ), speech=voice_stream(enable_voice_responses, current_language))
+            
+            status.success("🎯 Mood Analysis Complete!")
+            
+            # Store in vector database if available (written in background batches)
+            if vectorstore:
+                queued = vector_write_queue.enqueue(
+                    f"Mood: {mood_input}", 
+                    {
+                        "user": st.session_state.user_id, 
+                        "type": "mood", 
+                        "timestamp": str(datetime.datetime.now()),
+                        # Integer epoch so time-range filters use the int metadata index
+                        "ts": int(datetime.datetime.now().timestamp())
+                    }
+                )
+                if not queued:
+                    st.warning("Note: Could not save to long-term memory right now.")
+        else:
+            st.warning("Please share your mood before submitting.")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@fragment
+def render_mindfulness_tab(memory, llm, enable_voice_responses):
+    """Mindfulness tab"""
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.markdown('<h2 style="color: #1f3a60; text-align: center;">🌿 Mindfulness & Meditation Hub</h2>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Find your center with guided mindfulness practices</p>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("🧘 Get Personalized Mindfulness Exercise", use_container_width=True, key="mindfulness_btn"):
+            current_language = st.session_state.current_language
+            with st.spinner("🌱 Curating a perfect mindfulness exercise for you..."):
+                render_streamed_response(stream_llm_response(
+                    MINDFULNESS_PROMPT, 
+                    current_language, 
+                    'mindfulness', 
+                    llm, 
+                    memory,
+                    use_cache=True
+                ), speech=voice_stream(enable_voice_responses, current_language))
+
+    with col2:
+        if st.button("🌬️ Breathing & Relaxation Exercise", use_container_width=True, key="breathing_btn"):
+            current_language = st.session_state.current_language
+            with st.spinner("💨 Creating a calming breathing exercise..."):
+                render_streamed_response(stream_llm_response(
+                    BREATHING_PROMPT, 
+                    current_language, 
+                    'mindfulness', 
+                    llm, 
+                    memory,
+                    use_cache=True
+                ), speech=voice_stream(enable_voice_responses, current_language))
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@fragment
+def render_journal_tab(memory, llm, enable_voice_responses):
+    """Journal tab"""
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.markdown('<h2 style="color: #1f3a60; text-align: center;">📔 Reflection & Journal Space</h2>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Process your thoughts and track your growth journey</p>', unsafe_allow_html=True)
+    
+    if st.button("💡 Get Thoughtful Journal Prompt", use_container_width=True, key="journal_prompt_btn"):
+        current_language = st.session_state.current_language
+        with st.spinner("📝 Finding a meaningful prompt for reflection..."):
+            render_streamed_response(stream_llm_response(
+                JOURNAL_PROMPT, 
+                current_language, 
+                'journal', 
+                llm, 
+                memory,
+                use_cache=True
+            ), speech=voice_stream(enable_voice_responses, current_language))
+    
+    # Journal entry area
+    st.markdown("### ✍️ Your Personal Journal")
+    journal_entry = st.text_area(
+        "Write your thoughts, feelings, and reflections here:",
+        placeholder="This is your safe space to express yourself freely...\n\nWhat are you grateful for today?\nWhat challenges did you face?\nHow are you really feeling?\nWhat lessons have you learned?",
+        height=200,
+        key="journal_entry_area"
+    )
+    
+    if st.button("💾 Save This Journal Entry", use_container_width=True, key="save_journal_btn"):
+        if journal_entry:
+            queued = True
+            if vectorstore:
+                # Written in background batches; returns immediately
+                queued = vector_write_queue.enqueue(
+                    f"Journal: {journal_entry}",
+                    {
+                        "user": st.session_state.user_id, 
+                        "type": "journal", 
+                        "timestamp": str(datetime.datetime.now()),
+                        # Integer epoch so time-range filters use the int metadata index
+                        "ts": int(datetime.datetime.now().timestamp())
+                    }
+                )
+            if queued:
+                st.success("✅ Journal entry saved successfully! 📖")
+                st.balloons()
+            else:
+                st.warning("Entry noted locally. Cloud save is busy, please try again shortly.")
+        else:
+            st.warning("Please write something before saving.")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@fragment
+def render_motivation_tab(memory, llm, enable_voice_responses):
+    """Motivation tab"""
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.markdown('<h2 style="color: #1f3a60; text-align: center;">💫 Motivation & Inspiration Station</h2>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Get the boost you need to keep moving forward</p>', unsafe_allow_html=True)
+    
+    if st.button("🌟 Get Personalized Motivation", use_container_width=True, key="motivation_btn"):
+        current_language = st.session_state.current_language
+        with st.spinner("✨ Creating some inspiration just for you..."):
+            render_streamed_response(stream_llm_response(
+                MOTIVATION_PROMPT, 
+                current_language, 
+                'motivation', 
+                llm, 
+                memory,
+                use_cache=True
+            ), speech=voice_stream(enable_voice_responses, current_language))
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@fragment
+def render_creative_tab(memory, llm, enable_voice_responses):
+    """Creative space tab"""
+    st.markdown('<div class="custom-card">', unsafe_allow_html=True)
+    st.markdown('<h2 style="color: #1f3a60; text-align: center;">🎨 Creative Wellness Space</h2>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Explore additional wellness resources and creative tools</p>', unsafe_allow_html=True)
+    
+    topic = st.text_input(
+        "What wellness topic would you like to explore?", 
+        placeholder="e.g., meditation techniques, stress management, self-care routines, sleep improvement...",
+        key="wellness_topic_input"
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if topic and st.button("🔍 Get Wellness Resources", use_container_width=True, key="resources_btn"):
+            current_language = st.session_state.current_language
+            with st.spinner(f"🌿 Gathering wellness resources about {topic}..."):
+                response = render_streamed_response(stream_llm_response(
+                    f"Provide comprehensive mental wellness advice, tips, and resources about: {topic}", 
+                    current_language, 
+                    'general', 
+                    llm, 
+                    memory,
+                    use_cache=True
+                ), speech=voice_stream(enable_voice_responses, current_language))
+    
+    with col2:
+        if IMAGE_AVAILABLE:
+            if st.button("🖼️ Generate Inspirational Image", use_container_width=True, key="image_btn") and topic:
+                with st.spinner(f"🎨 Creating an inspirational visualization for {topic}..."):
+                    response = execute_wellness_tool(
+                        f"Generate inspirational image for: {topic}", 
+                        f"Requested inspirational image for {topic}", 
+                        memory, 
+                        llm
+                    )
+                st.success("🖼️ Image generated successfully!")
+                if isinstance(response, str) and response.startswith('http'):
+                    st.image(response, caption=f"Inspirational visualization: {topic}", use_column_width=True)
+        else:
+            st.info("🎨 Image generation features coming soon!")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@fragment
+def render_history_panel(memory):
+    """Conversation history panel"""
+    st.markdown("---")
+    st.markdown("## 💬 Your Wellness Journey History")
+    # Tab interactions only rerun their own fragment, so refresh on demand
+    st.button("🔄 Refresh History", key="refresh_history_btn")
+    
+    try:
+        if hasattr(memory, 'chat_memory') and hasattr(memory.chat_memory, 'messages'):
+            messages = memory.chat_memory.messages
+            if messages:
+                # Only the newest pages are rendered, so long sessions stay fast
+                pages = st.session_state.get('history_pages', 1)
+                hidden_count, earlier, latest = history_window(messages, pages)
+                
+                if hidden_count and st.button(f"⬆️ Load older messages ({hidden_count} hidden)", key="load_older_history_btn"):
+                    st.session_state.history_pages = pages + 1
+                    hidden_count, earlier, latest = history_window(messages, pages + 1)
+                
+                if earlier:
+                    with st.expander(f"Earlier messages ({len(earlier)})"):
+                        st.markdown(page_html(earlier), unsafe_allow_html=True)
+                st.markdown(page_html(latest), unsafe_allow_html=True)
+                st.markdown("---")
+            else:
+                st.info("🌟 Your conversation history will appear here as you start using the features above!")
+        else:
+            st.info("🌟 Start exploring the features above to begin your wellness journey!")
+            
+    except Exception as e:
+        st.info("🌟 Your wellness journey history will appear here as you use the app!")
+
+@fragment
+def render_daily_tip_panel(llm):
+    """Daily wellness tip panel"""
+    st.markdown("---")
+    st.markdown("## 🌞 Today's Personalized Wellness Tip")
+    
+    current_language = st.session_state.current_language
+    daily_tip = get_daily_tip(current_language, llm)
+    st.markdown(f'<div class="success-message">{daily_tip}</div>', unsafe_allow_html=True)
+    
+    # Speak reminder button - only speaks when explicitly clicked
+    if VOICE_AVAILABLE and st.button("🔊 Listen to This Tip", key="speak_tip_btn"):
+        speak_text(daily_tip, language=current_language)
+
 # Main Content Area
 if st.session_state.get('initialized', False):
-    # Access session state
-    memory = st.session_state.memory
+    # Access session state; memory is looked up each rerun so an evicted
+    # history is transparently reloaded from disk
+    memory = get_user_memory(st.session_state.user_id)
     llm = st.session_state.llm
     enable_voice_responses = st.session_state.enable_voice
     # Welcome Banner
@@ -598,291 +1127,29 @@ if st.session_state.get('initialized', False):
 
     # --- Daily Mood Check-In ---
     with tab1:
-        st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-        st.markdown('<h2 style="color: #1f3a60; text-align: center; margin: 0px 0;">🌈 How Are You Feeling Today?</h2>', unsafe_allow_html=True)
-        # Language info
-        current_language = st.session_state.current_language
-        if st.session_state.auto_detect:
-            st.markdown(f'<div class="info-box">🌐 Auto-detect: ON | Current: {language_names.get(current_language, "English")}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div class="info-box">🌐 Language: {language_names.get(current_language, "English")}</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns([1, 1])
-        
-        with col1:
-            st.markdown('<h4 style="color: #1f3a60;">🎤 Share Your Feelings</h4>', unsafe_allow_html=True)
-            mode = st.radio("Choose input method:", ["Text", "Voice"], horizontal=True, key="mood_input_mode")
-            mood_input = ""
-            
-            if mode == "Text":
-                mood_input = st.text_area(
-                    "Tell me about your day...",
-                    placeholder="I'm feeling... happy/sad/anxious/excited/tired/etc.\nWhat's on your mind?",
-                    height=120,
-                    key="mood_text_input"
-                )
-            else:
-                if VOICE_AVAILABLE:
-                    if st.button("🎤 Start Voice Recording", use_container_width=True, key="voice_record_btn"):
-                        with st.spinner("🎙️ Listening... Speak now..."):
-                            mood_input = record_voice()
-                    if mood_input:
-                        st.success("✅ Voice recorded successfully!")
-                        st.write(f"**You said:** {mood_input}")
-                else:
-                    st.warning("🎧 Voice input not available in this environment")
-        
-        with col2:
-            st.markdown('<h4 style="color: #1f3a60;">⚡ Quick Emotions</h4>', unsafe_allow_html=True)
-            quick_feelings = ["😊 Happy & Content", "😢 Sad & Low", "😰 Anxious & Worried", "😠 Frustrated & Angry", "😴 Tired & Drained", "😌 Calm & Peaceful", "🎉 Excited & Energetic"]
-            selected_feeling = st.selectbox("Select your current mood:", [""] + quick_feelings, key="quick_feelings_select")
-            
-            if selected_feeling:
-                mood_input = selected_feeling
-                st.info(f"Selected: {selected_feeling}")
-        
-        # Mood check button
-        if st.button("🔍 Analyze My Mood & Get Support", type="primary", use_container_width=True, key="analyze_mood_btn"):
-            if mood_input:
-                # Auto-detect language if enabled
-                current_language = st.session_state.current_language
-                if st.session_state.auto_detect:
-                    detected_lang = detect_user_language(mood_input)
-                    if detected_lang in supported_languages.values():
-                        current_language = detected_lang
-                        st.session_state.current_language = detected_lang
-                
-                with st.spinner("🔮 Analyzing your emotions and preparing personalized support..."):
-                    response = get_llm_response(
-                        mood_input, 
-                        current_language, 
-                        'mood_analysis', 
-                        llm, 
-                        memory
-                    )
-                
-                st.success("🎯 Mood Analysis Complete!")
-                st.markdown(f'<div class="custom-card">{response}</div>', unsafe_allow_html=True)
-
-                # Speak response if voice enabled
-                if VOICE_AVAILABLE and enable_voice_responses:
-                    speak_text(response, language=current_language)
-                
-                # Store in vector database if available
-                if vectorstore:
-                    try:
-                        vectorstore.add_texts(
-                            [f"Mood: {mood_input}"], 
-                            metadatas=[{
-                                "user": st.session_state.user_id, 
-                                "type": "mood", 
-                                "timestamp": str(datetime.datetime.now())
-                            }]
-                        )
-                    except Exception as e:
-                        st.warning(f"Note: Could not save to long-term memory: {e}")
-            else:
-                st.warning("Please share your mood before submitting.")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        render_mood_checkin_tab(memory, llm, enable_voice_responses)
 
     # --- Mindfulness ---
     with tab2:
-        st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-        st.markdown('<h2 style="color: #1f3a60; text-align: center;">🌿 Mindfulness & Meditation Hub</h2>', unsafe_allow_html=True)
-        st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Find your center with guided mindfulness practices</p>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            if st.button("🧘 Get Personalized Mindfulness Exercise", use_container_width=True, key="mindfulness_btn"):
-                current_language = st.session_state.current_language
-                with st.spinner("🌱 Curating a perfect mindfulness exercise for you..."):
-                    response = get_llm_response(
-                        "Provide a personalized mindfulness or meditation exercise", 
-                        current_language, 
-                        'mindfulness', 
-                        llm, 
-                        memory
-                    )
-                st.markdown(f'<div class="custom-card">{response}</div>', unsafe_allow_html=True)
-                if VOICE_AVAILABLE and enable_voice_responses:
-                    speak_text(response, language=current_language)
-
-        with col2:
-            if st.button("🌬️ Breathing & Relaxation Exercise", use_container_width=True, key="breathing_btn"):
-                current_language = st.session_state.current_language
-                with st.spinner("💨 Creating a calming breathing exercise..."):
-                    response = get_llm_response(
-                        "Provide a breathing exercise for deep relaxation and stress relief", 
-                        current_language, 
-                        'mindfulness', 
-                        llm, 
-                        memory
-                    )
-                st.markdown(f'<div class="custom-card">{response}</div>', unsafe_allow_html=True)
-                if VOICE_AVAILABLE and enable_voice_responses:
-                    speak_text(response, language=current_language)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        render_mindfulness_tab(memory, llm, enable_voice_responses)
 
     # --- Journal ---
     with tab3:
-        st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-        st.markdown('<h2 style="color: #1f3a60; text-align: center;">📔 Reflection & Journal Space</h2>', unsafe_allow_html=True)
-        st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Process your thoughts and track your growth journey</p>', unsafe_allow_html=True)
-        
-        if st.button("💡 Get Thoughtful Journal Prompt", use_container_width=True, key="journal_prompt_btn"):
-            current_language = st.session_state.current_language
-            with st.spinner("📝 Finding a meaningful prompt for reflection..."):
-                response = get_llm_response(
-                    "Provide an insightful journaling prompt for self-reflection and personal growth", 
-                    current_language, 
-                    'journal', 
-                    llm, 
-                    memory
-                )
-            st.markdown(f'<div class="custom-card">{response}</div>', unsafe_allow_html=True)
-            if VOICE_AVAILABLE and enable_voice_responses:
-                speak_text(response, language=current_language)
-        
-        # Journal entry area
-        st.markdown("### ✍️ Your Personal Journal")
-        journal_entry = st.text_area(
-            "Write your thoughts, feelings, and reflections here:",
-            placeholder="This is your safe space to express yourself freely...\n\nWhat are you grateful for today?\nWhat challenges did you face?\nHow are you really feeling?\nWhat lessons have you learned?",
-            height=200,
-            key="journal_entry_area"
-        )
-        
-        if st.button("💾 Save This Journal Entry", use_container_width=True, key="save_journal_btn"):
-            if journal_entry:
-                try:
-                    if vectorstore:
-                        vectorstore.add_texts(
-                            [f"Journal: {journal_entry}"],
-                            metadatas=[{
-                                "user": st.session_state.user_id, 
-                                "type": "journal", 
-                                "timestamp": str(datetime.datetime.now())
-                            }]
-                        )
-                    st.success("✅ Journal entry saved successfully! 📖")
-                    st.balloons()
-                except Exception as e:
-                    st.warning(f"Entry noted locally. Cloud save issue: {e}")
-            else:
-                st.warning("Please write something before saving.")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        render_journal_tab(memory, llm, enable_voice_responses)
 
     # --- Motivation ---
     with tab4:
-        st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-        st.markdown('<h2 style="color: #1f3a60; text-align: center;">💫 Motivation & Inspiration Station</h2>', unsafe_allow_html=True)
-        st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Get the boost you need to keep moving forward</p>', unsafe_allow_html=True)
-        
-        if st.button("🌟 Get Personalized Motivation", use_container_width=True, key="motivation_btn"):
-            current_language = st.session_state.current_language
-            with st.spinner("✨ Creating some inspiration just for you..."):
-                response = get_llm_response(
-                    "Provide personalized motivational encouragement and inspiration", 
-                    current_language, 
-                    'motivation', 
-                    llm, 
-                    memory
-                )
-            st.markdown(f'<div class="custom-card">{response}</div>', unsafe_allow_html=True)
-            if VOICE_AVAILABLE and enable_voice_responses:
-                speak_text(response, language=current_language)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        render_motivation_tab(memory, llm, enable_voice_responses)
 
     # --- Creative Space ---
     with tab5:
-        st.markdown('<div class="custom-card">', unsafe_allow_html=True)
-        st.markdown('<h2 style="color: #1f3a60; text-align: center;">🎨 Creative Wellness Space</h2>', unsafe_allow_html=True)
-        st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Explore additional wellness resources and creative tools</p>', unsafe_allow_html=True)
-        
-        topic = st.text_input(
-            "What wellness topic would you like to explore?", 
-            placeholder="e.g., meditation techniques, stress management, self-care routines, sleep improvement...",
-            key="wellness_topic_input"
-        )
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            if topic and st.button("🔍 Get Wellness Resources", use_container_width=True, key="resources_btn"):
-                current_language = st.session_state.current_language
-                with st.spinner(f"🌿 Gathering wellness resources about {topic}..."):
-                    response = get_llm_response(
-                        f"Provide comprehensive mental wellness advice, tips, and resources about: {topic}", 
-                        current_language, 
-                        'general', 
-                        llm, 
-                        memory
-                    )
-                st.markdown(f'<div class="custom-card">{response}</div>', unsafe_allow_html=True)
-                if VOICE_AVAILABLE and enable_voice_responses:
-                    speak_text(response, language=current_language)
-        
-        with col2:
-            if IMAGE_AVAILABLE:
-                if st.button("🖼️ Generate Inspirational Image", use_container_width=True, key="image_btn") and topic:
-                    with st.spinner(f"🎨 Creating an inspirational visualization for {topic}..."):
-                        response = execute_wellness_tool(
-                            f"Generate inspirational image for: {topic}", 
-                            f"Requested inspirational image for {topic}", 
-                            memory, 
-                            llm
-                        )
-                    st.success("🖼️ Image generated successfully!")
-                    if isinstance(response, str) and response.startswith('http'):
-                        st.image(response, caption=f"Inspirational visualization: {topic}", use_column_width=True)
-            else:
-                st.info("🎨 Image generation features coming soon!")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        render_creative_tab(memory, llm, enable_voice_responses)
 
     # --- Conversation History ---
-    st.markdown("---")
-    st.markdown("## 💬 Your Wellness Journey History")
-    
-    try:
-        if hasattr(memory, 'chat_memory') and hasattr(memory.chat_memory, 'messages'):
-            messages = memory.chat_memory.messages
-            if messages:
-                for i, msg in enumerate(messages):
-                    if i % 2 == 0:  # Human messages
-                        st.markdown(f'<div style="background: linear-gradient(135deg, #e3f2fd 0%, #bbdefb 100%); padding: 15px; border-radius: 15px; margin: 10px 0px;"><strong>You:</strong> {msg.content}</div>', unsafe_allow_html=True)
-                    else:  # AI messages
-                        st.markdown(f'<div style="background: linear-gradient(135deg, #f3e5f5 0%, #e1bee7 100%); padding: 15px; border-radius: 15px; margin: 10px 0px;"><strong>Assistant:</strong> {msg.content}</div>', unsafe_allow_html=True)
-                st.markdown("---")
-            else:
-                st.info("🌟 Your conversation history will appear here as you start using the features above!")
-        else:
-            st.info("🌟 Start exploring the features above to begin your wellness journey!")
-            
-    except Exception as e:
-        st.info("🌟 Your wellness journey history will appear here as you use the app!")
+    render_history_panel(memory)
 
     # --- Daily Wellness Tip ---
-    st.markdown("---")
-    st.markdown("## 🌞 Today's Personalized Wellness Tip")
-    
-    current_language = st.session_state.current_language
-    daily_tip = get_llm_response(
-        "Provide a brief, practical daily wellness tip or self-care reminder that is personalized and actionable", 
-        current_language, 
-        'motivation', 
-        llm
-    )
-    st.markdown(f'<div class="success-message">{daily_tip}</div>', unsafe_allow_html=True)
-    
-    # Speak reminder button - only speaks when explicitly clicked
-    if VOICE_AVAILABLE and st.button("🔊 Listen to This Tip", key="speak_tip_btn"):
-        speak_text(daily_tip, language=current_language)
+    render_daily_tip_panel(llm)
 
 else:
     # Landing page matching your app's gradient theme
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import threading
+
+
+# -----------------------
+# TTS Audio Cache Configuration
+# -----------------------
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "./db/tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+
+class AudioCache:
+    """
+    Content-addressed, size-bounded disk cache for synthesized speech.
+
+    Files are named by a hash of (text, language, engine, rate), so the same
+    utterance is synthesized once and replayed from disk afterwards. Every
+    hit refreshes the file's mtime and the least recently used files are
+    deleted once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text, language, engine, rate=None):
+        raw = f"{engine}\0{language}\0{rate}\0{' '.join(text.split())}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def path_for(self, key, ext):
+        return os.path.join(self.directory, key[:2], key + ext)
+
+    def get(self, key, ext):
+        """Return the cached file path, or None on a miss"""
+        path = self.path_for(key, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put_bytes(self, key, ext, data):
+        """Store audio bytes and return the cached file path"""
+        tmp_path = self.temp_path(key, ext)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        return self.commit(tmp_path, key, ext)
+
+    def temp_path(self, key, ext):
+        """A path to synthesize into before `commit` (for engines that write files)"""
+        os.makedirs(os.path.dirname(self.path_for(key, ext)), exist_ok=True)
+        return self.path_for(key, ext) + f".{threading.get_ident()}.tmp"
+
+    def commit(self, tmp_path, key, ext):
+        """Atomically move a finished temp file into the cache"""
+        path = self.path_for(key, ext)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size_bytes': self._size
+        }
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith('.tmp'):
+                    yield os.path.join(root, name)
+
+    def _scan_size(self):
+        return sum(os.path.getsize(path) for path in self._files())
+
+    def _evict(self):
+        # Oldest mtime first; evict down to 90% so we don't evict on every put
+        entries = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        entries.sort()
+        self._size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                os.unlink(path)
+                self._size -= size
+            except OSError:
+                continue
+
+
+# Global audio cache instance
+audio_cache = AudioCache()
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+try:
+    import speech_recognition as sr
+    from pydub import AudioSegment
+    from pydub.silence import split_on_silence
+    TRANSCRIPTION_AVAILABLE = True
+except ImportError:
+    TRANSCRIPTION_AVAILABLE = False
+    print("pydub/speech_recognition not available - audio upload disabled")
+
+from utils.voice_input import RECOGNIZERS, SPEECH_LANGUAGE_CODES, SPEECH_RECOGNIZER, SPEECH_RECOGNIZER_FALLBACK, fallback_for
+
+
+# -----------------------
+# Upload Transcription Configuration
+# -----------------------
+UPLOAD_AUDIO_TYPES = ["wav", "mp3", "ogg"]
+MAX_UPLOAD_SECONDS = int(os.getenv("MAX_UPLOAD_AUDIO_SECONDS", str(30 * 60)))
+# Segments are merged up to this length; the free Google endpoint rejects
+# requests much over a minute
+MAX_SEGMENT_SECONDS = 30
+MIN_SILENCE_MS = 700
+SILENCE_MARGIN_DB = 16
+KEEP_SILENCE_MS = 300
+TARGET_SAMPLE_RATE = 16000
+# Local recognizers are CPU-bound and run in processes (one per core);
+# network recognizers just wait on I/O and run in threads
+LOCAL_RECOGNIZERS = {'sphinx', 'whisper'}
+NETWORK_TRANSCRIPTION_WORKERS = 8
+
+# One progress update: the ordered transcript so far, and segment counts
+TranscriptUpdate = namedtuple('TranscriptUpdate', ['text', 'done', 'failed', 'total'])
+
+
+def split_audio(audio, max_segment_ms=MAX_SEGMENT_SECONDS * 1000):
+    """
+    Split a recording on silence into segments of at most `max_segment_ms`.
+
+    Neighbouring pieces are merged back up to the limit (fewer, longer
+    requests transcribe better and cost less), and pieces with no pause
+    long enough to split on are cut into fixed windows.
+    """
+    pieces = split_on_silence(
+        audio,
+        min_silence_len=MIN_SILENCE_MS,
+        silence_thresh=audio.dBFS - SILENCE_MARGIN_DB,
+        keep_silence=KEEP_SILENCE_MS
+    ) or [audio]
+
+    segments = []
+    for piece in pieces:
+        for start in range(0, len(piece), max_segment_ms):
+            window = piece[start:start + max_segment_ms]
+            if segments and len(segments[-1]) + len(window) <= max_segment_ms:
+                segments[-1] += window
+            else:
+                segments.append(window)
+    return segments
+
+# Set once per worker process, so local models (e.g. Whisper, which caches
+# its model on the recognizer) load once instead of once per segment
+_worker_recognizer = None
+
+def _init_worker():
+    global _worker_recognizer
+    _worker_recognizer = sr.Recognizer()
+
+def _transcribe_segment(raw_data, sample_rate, sample_width, language_code, recognizer_name, fallback_name):
+    """Transcribe one segment (top-level so it can run in a worker process)"""
+    if _worker_recognizer is None:
+        _init_worker()
+    recognizer = _worker_recognizer
+    audio = sr.AudioData(raw_data, sample_rate, sample_width)
+    try:
+        return RECOGNIZERS[recognizer_name](recognizer, audio, language_code)
+    except sr.UnknownValueError:
+        return ""
+    except sr.RequestError:
+        fallback = fallback_for(recognizer_name, fallback_name, language_code)
+        if fallback is None:
+            raise
+        try:
+            return RECOGNIZERS[fallback](recognizer, audio, language_code)
+        except sr.UnknownValueError:
+            return ""
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def _executor_for(recognizer_name):
+    """Shared pool for a recognizer, created on first use"""
+    with _executors_lock:
+        executor = _executors.get(recognizer_name)
+        if executor is None:
+            if recognizer_name in LOCAL_RECOGNIZERS:
+                # Spawn rather than fork: forking a process with live threads
+                # (Streamlit, the TTS and write queue workers) can deadlock
+                executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 2, initializer=_init_worker,
+                                               mp_context=multiprocessing.get_context("spawn"))
+            else:
+                executor = ThreadPoolExecutor(max_workers=NETWORK_TRANSCRIPTION_WORKERS, initializer=_init_worker)
+            _executors[recognizer_name] = executor
+        return executor
+
+def _discard_executor(recognizer_name, executor):
+    """Drop a broken pool (e.g. a worker process died) so the next upload gets a new one"""
+    with _executors_lock:
+        if _executors.get(recognizer_name) is executor:
+            del _executors[recognizer_name]
+    executor.shutdown(wait=False)
+
+
+def transcribe_upload(file, language='en', recognizer_name=SPEECH_RECOGNIZER, fallback_name=SPEECH_RECOGNIZER_FALLBACK):
+    """
+    Transcribe an uploaded audio file, yielding the transcript as it grows.
+
+    Every yielded TranscriptUpdate holds the text of all segments
+    recognized so far, in order, so the caller can show progress; the last
+    one has the full transcript and how many segments failed, so a partial
+    transcript can be flagged. Raises ValueError for unreadable or
+    over-long files and RuntimeError if every segment failed.
+    """
+    extension = os.path.splitext(getattr(file, 'name', ''))[1].lstrip('.').lower() or None
+    try:
+        audio = AudioSegment.from_file(file, format=extension)
+    except Exception as e:
+        raise ValueError(f"Could not read the audio file: {e}")
+    if len(audio) > MAX_UPLOAD_SECONDS * 1000:
+        raise ValueError(f"Recordings are limited to {MAX_UPLOAD_SECONDS // 60} minutes")
+
+    # Mono 16 kHz 16-bit: what the recognizers expect, and small to ship to workers
+    audio = audio.set_channels(1).set_frame_rate(TARGET_SAMPLE_RATE).set_sample_width(2)
+    segments = split_audio(audio)
+    language_code = SPEECH_LANGUAGE_CODES.get(language, 'en-IN')
+
+    def _submit_all(executor):
+        return {
+            executor.submit(_transcribe_segment, segment.raw_data, segment.frame_rate, segment.sample_width,
+                            language_code, recognizer_name, fallback_name): index
+            for index, segment in enumerate(segments)
+        }
+
+    executor = _executor_for(recognizer_name)
+    try:
+        futures = _submit_all(executor)
+    except (BrokenExecutor, RuntimeError):
+        # Broken by an earlier upload (or shut down); rebuild it once
+        _discard_executor(recognizer_name, executor)
+        executor = _executor_for(recognizer_name)
+        futures = _submit_all(executor)
+
+    texts = {}
+    pending = set(futures)
+    errors = []
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                texts[futures[future]] = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenExecutor):
+                    _discard_executor(recognizer_name, executor)
+                errors.append(e)
+                texts[futures[future]] = ""
+        ordered = []
+        for index in range(len(segments)):
+            if index not in texts:
+                break
+            ordered.append(texts[index])
+        yield TranscriptUpdate(" ".join(text for text in ordered if text), len(texts), len(errors), len(segments))
+
+    if errors and not any(texts.values()):
+        raise RuntimeError(f"Speech recognition service error: {errors[0]}")
+    if errors:
+        print(f"Upload transcription: {len(errors)} of {len(segments)} segments failed: {errors[0]}")
@@ -0,0 +1,103 @@
+import json
+import re
+
+
+# -----------------------
+# Batch Generation Configuration
+# -----------------------
+MIN_ITEM_CHARS = 15
+MAX_ITEM_CHARS = 4000
+
+_CODE_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$', re.MULTILINE)
+_NUMBERED_ITEM = re.compile(r'^\s*(?:\d+[.)]|[-*•])\s+', re.MULTILINE)
+
+
+def batch_list_instructions(count):
+    """Instructions appended to a prompt to get `count` items in one response"""
+    return (
+        f"\n\nGenerate {count} distinct, varied responses to the request above. "
+        f"Return ONLY a JSON array of {count} strings, one complete response per string, "
+        "with no commentary before or after the array."
+    )
+
+def batch_language_instructions(language_names):
+    """Instructions to get one item per language as a JSON object keyed by language code"""
+    listing = ", ".join(f'"{code}" ({name})' for code, name in language_names.items())
+    return (
+        f"\n\nWrite one response for each of these languages: {listing}. "
+        "Each response must be written entirely in its language. "
+        "Return ONLY a JSON object mapping each language code to its response, "
+        "with no commentary before or after the object."
+    )
+
+def _extract_json(text, opening, closing):
+    text = _CODE_FENCE.sub('', text.strip())
+    start, end = text.find(opening), text.rfind(closing)
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+def _valid_item(item):
+    if not isinstance(item, str):
+        return None
+    item = item.strip()
+    if not MIN_ITEM_CHARS <= len(item) <= MAX_ITEM_CHARS:
+        return None
+    return item
+
+def parse_batch_items(text, expected=None):
+    """
+    Parse a list of items from a batch response.
+
+    Accepts a JSON array (optionally inside a code fence). A numbered or
+    bulleted list is only accepted when it has exactly `expected` entries,
+    since a single response can itself contain numbered steps. Items that
+    are not strings, are too short or too long, or duplicate an earlier
+    item are dropped.
+    """
+    data = _extract_json(text, '[', ']')
+    if isinstance(data, list):
+        candidates = data
+    else:
+        parts = _NUMBERED_ITEM.split(text)[1:]
+        candidates = parts if expected and len(parts) == expected else []
+
+    items, seen = [], set()
+    for candidate in candidates:
+        item = _valid_item(candidate)
+        if item is None or item.lower() in seen:
+            continue
+        seen.add(item.lower())
+        items.append(item)
+    return items[:expected] if expected else items
+
+def parse_language_items(text, languages):
+    """Parse {language_code: item} from a per-language batch response"""
+    data = _extract_json(text, '{', '}')
+    if not isinstance(data, dict):
+        return {}
+    items = {}
+    for code in languages:
+        item = _valid_item(data.get(code))
+        if item is not None:
+            items[code] = item
+    return items
+
+def generate_batch(llm, prompt, count):
+    """Generate up to `count` items with a single LLM call; raises if none are usable"""
+    response = llm.invoke(prompt + batch_list_instructions(count))
+    items = parse_batch_items(response.content, expected=count)
+    if not items:
+        raise ValueError("Batch response contained no usable items")
+    return items
+
+def generate_per_language(llm, prompt, language_names):
+    """Generate one item per language with a single LLM call; raises if none are usable"""
+    response = llm.invoke(prompt + batch_language_instructions(language_names))
+    items = parse_language_items(response.content, list(language_names))
+    if not items:
+        raise ValueError("Batch response contained no usable items")
+    return items
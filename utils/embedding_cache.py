@@ -0,0 +1,229 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:
+    Embeddings = object
+
+
+# -----------------------
+# Embedding Cache Configuration
+# -----------------------
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./db/embedding_cache.sqlite3")
+MAX_VECTORS_IN_RAM = int(os.getenv("EMBEDDING_CACHE_RAM_ENTRIES", "10000"))
+MAX_VECTORS_ON_DISK = int(os.getenv("EMBEDDING_CACHE_DISK_ENTRIES", "200000"))
+# Vectors unused for this long are dropped from disk (0 keeps them until evicted by size)
+DISK_TTL_DAYS = float(os.getenv("EMBEDDING_CACHE_TTL_DAYS", "90"))
+# Size and age limits are enforced after this many writes
+PRUNE_EVERY_WRITES = 1000
+
+
+def normalize_text(text):
+    """Normalize Unicode form and whitespace so trivially different strings share a key"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def embedding_key(namespace, kind, text):
+    # Gemini embeds queries and documents with different task types, so the
+    # kind is part of the key
+    raw = f"{namespace}\0{kind}\0{normalize_text(text)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class SQLiteVectorStore:
+    """On-disk key -> float32 vector store, bounded by entry count and idle age"""
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH, max_entries=MAX_VECTORS_ON_DISK, ttl_days=DISK_TTL_DAYS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_days * 86400
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(embedding_cache)")]
+        if 'last_used' not in columns:
+            # Caches written before eviction existed; their age counts from now
+            self._conn.execute("ALTER TABLE embedding_cache ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE embedding_cache SET last_used = ?", (time.time(),))
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embedding_cache_last_used ON embedding_cache (last_used)")
+        self._conn.commit()
+        self.prune()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+            if found:
+                # Hits count as use, so frequently read vectors survive eviction
+                hit_keys = list(found)
+                now = time.time()
+                with self._conn:
+                    for start in range(0, len(hit_keys), 500):
+                        chunk = hit_keys[start:start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        self._conn.execute(
+                            f"UPDATE embedding_cache SET last_used = ? WHERE key IN ({placeholders})",
+                            [now] + chunk
+                        )
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        rows = [(key, array('f', vector).tobytes(), now) for key, vector in items]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, vector, last_used) VALUES (?, ?, ?)", rows
+                )
+            self._writes_since_prune += len(rows)
+            due = self._writes_since_prune >= PRUNE_EVERY_WRITES
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Drop vectors idle for longer than the TTL, then the least recently used above max_entries"""
+        removed = 0
+        with self._lock:
+            self._writes_since_prune = 0
+            with self._conn:
+                if self.ttl_seconds > 0:
+                    removed += self._conn.execute(
+                        "DELETE FROM embedding_cache WHERE last_used < ?", (time.time() - self.ttl_seconds,)
+                    ).rowcount
+                if self.max_entries:
+                    excess = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0] - self.max_entries
+                    if excess > 0:
+                        removed += self._conn.execute(
+                            "DELETE FROM embedding_cache WHERE key IN "
+                            "(SELECT key FROM embedding_cache ORDER BY last_used LIMIT ?)", (excess,)
+                        ).rowcount
+        return removed
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embedding function wrapper with an in-RAM LRU and an on-disk cache.
+
+    Keys are (model namespace, query/document, normalized text hash). Only
+    texts missing from both tiers are sent to the wrapped embeddings, in a
+    single batched call. Can be passed to Chroma anywhere the plain
+    embedding function is used.
+    """
+
+    def __init__(self, underlying, namespace, store=None, max_in_ram=MAX_VECTORS_IN_RAM):
+        self.underlying = underlying
+        self.namespace = namespace
+        self.store = store
+        self.max_in_ram = max_in_ram
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts):
+        return self._embed(list(texts), 'document')
+
+    def embed_query(self, text):
+        return self._embed([text], 'query')[0]
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'in_ram': len(self._lru)
+        }
+
+    def _embed(self, texts, kind):
+        keys = [embedding_key(self.namespace, kind, text) for text in texts]
+        vectors = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    vectors[key] = self._lru[key]
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing and self.store is not None:
+            try:
+                from_disk = self.store.get_many(missing)
+            except Exception as e:
+                print(f"Embedding cache read failed: {e}")
+                from_disk = {}
+            vectors.update(from_disk)
+            self._remember(from_disk.items())
+            missing = [key for key in missing if key not in from_disk]
+
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing_set = set(missing)
+            # One text per missing key, in a single batched call
+            to_embed = {}
+            for key, text in zip(keys, texts):
+                if key in missing_set and key not in to_embed:
+                    to_embed[key] = text
+            if kind == 'query':
+                fresh = [self.underlying.embed_query(text) for text in to_embed.values()]
+            else:
+                fresh = self.underlying.embed_documents(list(to_embed.values()))
+            new_items = list(zip(to_embed.keys(), [list(v) for v in fresh]))
+            vectors.update(new_items)
+            self._remember(new_items)
+            if self.store is not None:
+                try:
+                    self.store.put_many(new_items)
+                except Exception as e:
+                    print(f"Embedding cache write failed: {e}")
+
+        return [vectors[key] for key in keys]
+
+    def _remember(self, items):
+        with self._lock:
+            for key, vector in items:
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.max_in_ram:
+                self._lru.popitem(last=False)
+
+
+def with_embedding_cache(underlying, namespace):
+    """Wrap embeddings with the shared on-disk cache (RAM only if unavailable)"""
+    try:
+        store = SQLiteVectorStore()
+    except Exception as e:
+        print(f"Embedding disk cache disabled: {e}")
+        store = None
+    return CachedEmbeddings(underlying, namespace, store=store)
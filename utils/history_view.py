@@ -0,0 +1,50 @@
+import html
+import re
+from functools import lru_cache
+
+
+# Messages per history page (5 exchanges)
+HISTORY_PAGE_SIZE = 10
+
+_USER_STYLE = "background: linear-gradient(135deg, #e3f2fd 0%, #bbdefb 100%); padding: 15px; border-radius: 15px; margin: 10px 0px;"
+_ASSISTANT_STYLE = "background: linear-gradient(135deg, #f3e5f5 0%, #e1bee7 100%); padding: 15px; border-radius: 15px; margin: 10px 0px;"
+_BOLD = re.compile(r'\*\*(.+?)\*\*')
+
+
+def content_html(content):
+    """
+    Escape message text for use inside an HTML block. Markdown is not parsed
+    inside raw HTML, and a blank line would end the block early, so line
+    breaks become <br> and only **bold** is kept.
+    """
+    escaped = html.escape(content or "", quote=False)
+    escaped = _BOLD.sub(r'<strong>\1</strong>', escaped)
+    return "<br>".join(line.strip() for line in escaped.splitlines())
+
+@lru_cache(maxsize=4096)
+def message_html(is_user, content):
+    """HTML block for one history message (cached, so unchanged messages cost nothing)"""
+    content = content_html(content)
+    if is_user:
+        return f'<div style="{_USER_STYLE}"><strong>You:</strong> {content}</div>'
+    return f'<div style="{_ASSISTANT_STYLE}"><strong>Assistant:</strong> {content}</div>'
+
+def page_html(messages):
+    """Single HTML string for a run of messages, rendered with one st.markdown call"""
+    return "".join(message_html(getattr(msg, 'type', '') == 'human', msg.content) for msg in messages)
+
+def history_window(messages, pages, page_size=HISTORY_PAGE_SIZE):
+    """
+    Split messages into (hidden_count, earlier, latest).
+
+    `latest` is the newest page, `earlier` holds the additional pages the
+    user has loaded (shown collapsed) and `hidden_count` is the number of
+    older messages not rendered at all.
+    """
+    visible = min(len(messages), page_size * max(pages, 1))
+    # Keep whole exchanges together
+    if visible % 2 and visible < len(messages):
+        visible += 1
+    window = messages[len(messages) - visible:]
+    latest_size = min(page_size, len(window))
+    return len(messages) - visible, window[:len(window) - latest_size], window[len(window) - latest_size:]
@@ -0,0 +1,153 @@
+import re
+from collections import namedtuple
+
+
+Route = namedtuple('Route', ['context_type', 'confidence'])
+
+# Ties are broken in this order (same precedence as the original keyword checks)
+CONTEXT_PRIORITY = ('mood_analysis', 'mindfulness', 'motivation', 'journal')
+
+# Keywords per context and language. Latin keywords match at the start of a
+# word, so "feel" also matches "feeling" and "inspire" matches "inspirational".
+# Stems are kept long enough not to start unrelated words ("positiv", not
+# "positi", which would match "position").
+INTENT_KEYWORDS = {
+    'mood_analysis': {
+        'en': ["mood", "feeling", "feel", "emotion", "emotional"],
+        'hi': ["मूड", "महसूस", "भावना", "भावनात्मक", "उदास", "दुखी"],
+        'mr': ["मूड", "वाटत", "भावना", "भावनिक", "उदास", "दुःखी"],
+        'es': ["estado de ánimo", "siento", "sentir", "emoción", "emocional", "triste"],
+        'fr': ["humeur", "je me sens", "sentiment", "émotion", "émotionnel", "triste"],
+        'de': ["stimmung", "fühle", "gefühl", "emotion", "emotional", "traurig"],
+    },
+    'mindfulness': {
+        'en': ["mindfulness", "meditation", "exercise", "breathe", "calm", "relax"],
+        'hi': ["ध्यान", "सांस", "शांत", "आराम", "माइंडफुलनेस", "व्यायाम"],
+        'mr': ["ध्यान", "श्वास", "शांत", "आराम", "माइंडफुलनेस", "व्यायाम"],
+        'es': ["atención plena", "meditación", "meditar", "ejercicio", "respira", "calma", "relaja"],
+        'fr': ["pleine conscience", "méditation", "méditer", "exercice", "respir", "calme", "détend"],
+        'de': ["achtsamkeit", "meditation", "meditier", "übung", "atme", "atmung", "ruhe", "entspann"],
+    },
+    'motivation': {
+        'en': ["motivation", "quote", "inspire", "inspiration", "encouragement", "positive"],
+        'hi': ["प्रेरणा", "प्रेरित", "उद्धरण", "प्रोत्साहन", "सकारात्मक"],
+        'mr': ["प्रेरणा", "प्रेरित", "सुविचार", "प्रोत्साहन", "सकारात्मक"],
+        'es': ["motivación", "motivar", "cita motivadora", "citas motivadoras", "frase", "inspira", "aliento", "positiv"],
+        'fr': ["motivation", "citation", "inspir", "encourage", "positif", "positiv"],
+        'de': ["motivation", "zitat", "inspir", "ermutig", "positiv"],
+    },
+    'journal': {
+        'en': ["journal", "prompt", "write", "reflect", "reflection"],
+        'hi': ["जर्नल", "डायरी", "लिख", "चिंतन"],
+        'mr': ["जर्नल", "डायरी", "लिहा", "लिहि", "चिंतन"],
+        'es': ["diario", "escrib", "reflexi"],
+        'fr': ["journal", "écri", "réfléch", "réflexion"],
+        'de': ["tagebuch", "schreib", "reflekt", "reflexion"],
+    },
+}
+
+_DEVANAGARI = re.compile(r'[ऀ-ॿ]')
+
+
+def _trigram_set(word):
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class KeywordSimilarityClassifier:
+    """
+    Lightweight local fallback for inputs with no exact keyword hit.
+
+    Compares each input word with the keyword vocabulary by character
+    trigram overlap, which catches typos and inflections the prefix
+    patterns miss (e.g. "meditaton", "journaling").
+    """
+
+    def __init__(self, keywords, min_similarity=0.5):
+        self.min_similarity = min_similarity
+        self._vocabulary = [
+            (keyword, context_type, _trigram_set(keyword))
+            for context_type, by_language in keywords.items()
+            for words in by_language.values()
+            for keyword in words
+            if ' ' not in keyword and len(keyword) >= 4
+        ]
+
+    def __call__(self, text):
+        scores = {}
+        for word in re.findall(r'\w+', text.lower()):
+            if len(word) < 4:
+                continue
+            grams = _trigram_set(word)
+            best_context, best_similarity = None, 0.0
+            for _, context_type, keyword_grams in self._vocabulary:
+                similarity = len(grams & keyword_grams) / len(grams | keyword_grams)
+                if similarity > best_similarity:
+                    best_context, best_similarity = context_type, similarity
+            # Strictly above the threshold: at exactly 0.5 a shared prefix alone
+            # would match, e.g. "position" and "positiv"
+            if best_similarity > self.min_similarity:
+                scores[best_context] = scores.get(best_context, 0.0) + best_similarity
+        if not scores:
+            return Route('general', 0.0)
+        best = max(CONTEXT_PRIORITY, key=lambda c: scores.get(c, 0.0))
+        return Route(best, round(scores[best] / sum(scores.values()) * 0.5, 3))
+
+
+class IntentRouter:
+    """
+    Routes a query to a prompt context type in a single regex pass.
+
+    All keywords for all languages are compiled into one alternation; every
+    match is counted towards its context, and the context with most hits
+    wins (ties follow CONTEXT_PRIORITY). When nothing matches, an optional
+    classifier is consulted before falling back to 'general'.
+    """
+
+    def __init__(self, keywords=INTENT_KEYWORDS, classifier=None, min_classifier_confidence=0.2):
+        self.classifier = classifier
+        self.min_classifier_confidence = min_classifier_confidence
+        self._contexts = {}
+        for context_type, by_language in keywords.items():
+            for words in by_language.values():
+                for keyword in words:
+                    self._contexts.setdefault(keyword.lower(), set()).add(context_type)
+
+        latin, devanagari = [], []
+        for keyword in sorted(self._contexts, key=len, reverse=True):
+            if _DEVANAGARI.search(keyword):
+                devanagari.append(re.escape(keyword))
+            else:
+                latin.append(re.escape(keyword))
+        # Devanagari vowel signs are not \w, so \w alone can't tell where a
+        # Devanagari word starts ("शांत" inside "अशांत")
+        alternatives = []
+        if latin:
+            alternatives.append(r'(?<!\w)(?:' + '|'.join(latin) + ')')
+        if devanagari:
+            alternatives.append(r'(?<![\w\u0900-\u097F])(?:' + '|'.join(devanagari) + ')')
+        self._pattern = re.compile('|'.join(alternatives))
+
+    def route(self, text):
+        """Return Route(context_type, confidence) for the query"""
+        hits = {}
+        for match in self._pattern.finditer(text.lower()):
+            for context_type in self._contexts[match.group(0)]:
+                hits[context_type] = hits.get(context_type, 0) + 1
+
+        if hits:
+            best = max(CONTEXT_PRIORITY, key=lambda c: hits.get(c, 0))
+            return Route(best, round(hits[best] / sum(hits.values()), 3))
+
+        if self.classifier is not None:
+            route = self.classifier(text)
+            if route.confidence >= self.min_classifier_confidence:
+                return route
+        return Route('general', 0.0)
+
+
+# Global router instance
+intent_router = IntentRouter(classifier=KeywordSimilarityClassifier(INTENT_KEYWORDS))
+
+def route_intent(text):
+    return intent_router.route(text)
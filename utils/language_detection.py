@@ -0,0 +1,156 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+
+# -----------------------
+# Language Detection Configuration
+# -----------------------
+# Below this confidence the result is cross-checked with langdetect
+MIN_CONFIDENCE = 0.35
+# langdetect is unreliable on very short inputs, so don't bother below this
+MIN_FALLBACK_LETTERS = 20
+
+_DEVANAGARI = re.compile(r'[ऀ-ॿ]')
+_LATIN = re.compile(r'[A-Za-zÀ-ɏ]')
+_WORDS = re.compile(r'[^\W\d_]+(?:[ऀ-ःऺ-ॏॢॣ][^\W\d_]*)*')
+
+# Frequent function words and feeling words per language
+_COMMON_WORDS = {
+    'en': {"i", "am", "the", "and", "is", "to", "a", "of", "my", "me", "it", "feel", "feeling",
+           "today", "so", "very", "not", "with", "what", "how", "have", "was", "im", "i'm", "but", "this",
+           "happy", "sad", "low", "anxious", "worried", "angry", "tired", "drained", "calm", "peaceful",
+           "excited", "content", "stressed", "lonely", "alone", "good", "bad"},
+    'es': {"me", "siento", "estoy", "el", "la", "los", "las", "y", "que", "de", "muy", "hoy", "con",
+           "mi", "por", "para", "una", "un", "no", "es", "pero", "cómo", "como", "tengo", "qué",
+           "feliz", "triste", "ansioso", "ansiosa", "cansado", "cansada", "tranquilo", "enojado", "solo", "sola"},
+    'fr': {"je", "me", "suis", "le", "la", "les", "et", "de", "très", "aujourd'hui", "mon", "ma", "mes",
+           "pas", "ne", "est", "un", "une", "avec", "pour", "sens", "mais", "comment", "j'ai", "du",
+           "heureux", "heureuse", "triste", "anxieux", "fatigué", "fatiguée", "calme", "seul", "seule", "stressé"},
+    'de': {"ich", "bin", "mich", "fühle", "der", "die", "das", "und", "sehr", "heute", "mein", "meine",
+           "nicht", "ist", "mit", "ein", "eine", "zu", "es", "aber", "wie", "habe", "auf", "sich",
+           "glücklich", "traurig", "ängstlich", "müde", "ruhig", "wütend", "allein", "einsam", "gestresst"},
+    'hi': {"है", "हैं", "मैं", "नहीं", "और", "बहुत", "क्या", "मुझे", "मेरा", "मेरी", "हूं", "हूँ", "था",
+           "थी", "रहा", "रही", "लग", "कैसे", "आप", "को", "के", "में", "से", "का", "की", "यह"},
+    'mr': {"आहे", "आहेत", "आहात", "मला", "मी", "तुम्ही", "नाही", "आणि", "पण", "खूप", "काय", "कसे",
+           "वाटत", "माझे", "माझा", "माझी", "झाले", "आज", "होतो", "होते", "तर", "ला", "ची", "चा", "हे"},
+}
+
+# Letters that strongly indicate one language
+_MARKER_CHARS = {
+    'es': set("ñ¿¡"),
+    'fr': set("çœèêëîïûù"),
+    'de': set("ßäöü"),
+    'mr': set("ळ"),
+}
+
+# Small seed corpora used to build the character trigram profiles
+_SEED_TEXT = {
+    'en': "I feel tired and a little anxious today. Thank you for helping me relax and breathe. "
+          "What can I do to feel better when my mind is racing? I would like a short exercise.",
+    'es': "Me siento cansado y un poco ansioso hoy. Gracias por ayudarme a relajarme y respirar. "
+          "¿Qué puedo hacer para sentirme mejor cuando mi mente no para? Quisiera un ejercicio corto.",
+    'fr': "Je me sens fatigué et un peu anxieux aujourd'hui. Merci de m'aider à me détendre et à respirer. "
+          "Que puis-je faire pour aller mieux quand mon esprit s'emballe ? J'aimerais un exercice court.",
+    'de': "Ich fühle mich heute müde und ein wenig ängstlich. Danke, dass du mir hilfst, mich zu entspannen. "
+          "Was kann ich tun, damit es mir besser geht, wenn meine Gedanken rasen? Ich möchte eine kurze Übung.",
+    'hi': "मैं आज थका हुआ और थोड़ा चिंतित महसूस कर रहा हूं। आराम करने और सांस लेने में मदद के लिए धन्यवाद। "
+          "जब मेरा मन बेचैन हो तो बेहतर महसूस करने के लिए मैं क्या कर सकता हूं? मुझे एक छोटा अभ्यास चाहिए।",
+    'mr': "मला आज थकल्यासारखे आणि थोडे चिंताग्रस्त वाटत आहे. आराम करण्यास आणि श्वास घेण्यास मदत केल्याबद्दल धन्यवाद. "
+          "माझे मन अस्वस्थ असते तेव्हा बरे वाटण्यासाठी मी काय करू शकतो? मला एक छोटा व्यायाम हवा आहे.",
+}
+
+
+def _trigrams(text):
+    grams = Counter()
+    for word in _WORDS.findall(text.lower()):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams[padded[i:i + 3]] += 1
+    return grams
+
+def _normalize_profile(grams):
+    norm = math.sqrt(sum(v * v for v in grams.values())) or 1.0
+    return {g: v / norm for g, v in grams.items()}
+
+_PROFILES = {lang: _normalize_profile(_trigrams(text)) for lang, text in _SEED_TEXT.items()}
+_SCRIPT_LANGUAGES = {
+    'devanagari': ('hi', 'mr'),
+    'latin': ('en', 'es', 'fr', 'de'),
+}
+
+
+def detect_script(text):
+    """Return 'devanagari', 'latin' or None based on the dominant letter script"""
+    devanagari = len(_DEVANAGARI.findall(text))
+    latin = len(_LATIN.findall(text))
+    if devanagari == 0 and latin == 0:
+        return None
+    return 'devanagari' if devanagari >= latin else 'latin'
+
+def _score(text, candidates):
+    lowered = text.lower()
+    words = _WORDS.findall(lowered)
+    grams = _normalize_profile(_trigrams(lowered))
+    scores = {}
+    for lang in candidates:
+        stopword_hits = sum(1 for w in words if w in _COMMON_WORDS[lang])
+        marker_hits = sum(1 for ch in lowered if ch in _MARKER_CHARS.get(lang, ()))
+        profile = _PROFILES[lang]
+        trigram_sim = sum(weight * profile.get(g, 0.0) for g, weight in grams.items())
+        scores[lang] = 2.0 * stopword_hits / max(len(words), 1) + 0.5 * min(marker_hits, 3) + trigram_sim
+    return scores
+
+def _detect_local(text):
+    script = detect_script(text)
+    if script is None:
+        return None, 0.0
+
+    scores = _score(text, _SCRIPT_LANGUAGES[script])
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best, best_score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    confidence = (best_score - runner_up) / best_score if best_score > 0 else 0.0
+    return best, round(confidence, 3)
+
+def _langdetect_fallback(text, candidates):
+    try:
+        from langdetect import DetectorFactory, detect_langs
+        DetectorFactory.seed = 0
+        for guess in detect_langs(text):
+            if guess.lang in candidates:
+                return guess.lang
+    except Exception:
+        pass
+    return None
+
+def detect_language_with_confidence(text):
+    """
+    Return (language_code, confidence) for one of the supported languages.
+
+    Script detection narrows the candidates (Devanagari -> hi/mr, Latin ->
+    en/es/fr/de), then stopwords, marker letters and character trigrams
+    pick the language. Text with no letters (e.g. only emoji) gives
+    (None, 0.0).
+    """
+    if not text or not text.strip():
+        return None, 0.0
+    return _detect_cached(" ".join(text.split()))
+
+@lru_cache(maxsize=4096)
+def _detect_cached(text):
+    lang, confidence = _detect_local(text)
+
+    if lang is not None and confidence < MIN_CONFIDENCE:
+        letters = len(_DEVANAGARI.findall(text)) + len(_LATIN.findall(text))
+        if letters >= MIN_FALLBACK_LETTERS:
+            fallback = _langdetect_fallback(text, _SCRIPT_LANGUAGES[detect_script(text)])
+            if fallback:
+                return fallback, confidence
+    return lang, confidence
+
+def detect_language(text, default=None):
+    """Detect language from user input; returns `default` when there is no signal"""
+    lang, _ = detect_language_with_confidence(text)
+    return lang or default
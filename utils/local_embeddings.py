@@ -0,0 +1,73 @@
+import hashlib
+import math
+import re
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:
+    Embeddings = object
+
+from utils.embedding_cache import normalize_text
+
+
+# -----------------------
+# Local Embedding Configuration
+# -----------------------
+LOCAL_MODEL_PREFIX = "local-hashing"
+DEFAULT_DIMENSIONS = 384
+NGRAM_SIZE = 3
+WORD_WEIGHT = 1.0
+NGRAM_WEIGHT = 0.5
+
+# Devanagari vowel signs and viramas are not \w, so the block is listed
+# explicitly to keep Hindi and Marathi words whole (minus the danda marks)
+_WORD = re.compile(r'[\w\u0900-\u0963\u0966-\u097F]+', re.UNICODE)
+
+
+def is_local_model(model):
+    return model.startswith(LOCAL_MODEL_PREFIX)
+
+def dimensions_for(model):
+    """'local-hashing' -> 384, 'local-hashing-768' -> 768"""
+    suffix = model[len(LOCAL_MODEL_PREFIX):].lstrip("-")
+    return int(suffix) if suffix.isdigit() else DEFAULT_DIMENSIONS
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    CPU-only embeddings using signed feature hashing.
+
+    Words and character trigrams (which cope with inflection and with
+    Devanagari) are hashed into a fixed number of dimensions and the vector
+    is L2-normalized, so cosine similarity tracks lexical overlap. It is
+    deterministic across processes, needs no model files and no network,
+    and embeds a short text in well under a millisecond.
+    """
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+    def _features(self, text):
+        for word in _WORD.findall(normalize_text(text).lower()):
+            yield "w:" + word, WORD_WEIGHT
+            padded = f"<{word}>"
+            for i in range(len(padded) - NGRAM_SIZE + 1):
+                yield "n:" + padded[i:i + NGRAM_SIZE], NGRAM_WEIGHT
+
+    def _embed(self, text):
+        vector = [0.0] * self.dimensions
+        for feature, weight in self._features(text or ""):
+            digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            # The low bit picks the sign so colliding features tend to cancel out
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dimensions] += sign * weight
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm:
+            vector = [value / norm for value in vector]
+        return vector
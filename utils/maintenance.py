@@ -0,0 +1,219 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from utils.embedding_cache import EMBEDDING_CACHE_PATH
+from utils.partitioning import partition_collection_names, timestamp_to_ts
+from utils.resources import PERSIST_DIR, RESPONSE_CACHE_COLLECTION, get_chroma_client
+from utils.response_cache import CACHE_TTL_SECONDS
+from utils.write_queue import entry_id
+
+
+# -----------------------
+# Maintenance Configuration
+# -----------------------
+# Days to keep each entry type; types not listed (and 0) are kept forever.
+# Override with e.g. RETENTION_DAYS="mood=180,journal=0"
+DEFAULT_RETENTION_DAYS = {'mood': 365, 'journal': 0}
+MAINTENANCE_INTERVAL_HOURS = float(os.getenv("MAINTENANCE_INTERVAL_HOURS", "0"))
+# VACUUM rewrites the whole file and needs exclusive access, so scheduled
+# runs skip it unless explicitly enabled
+MAINTENANCE_VACUUM = os.getenv("MAINTENANCE_VACUUM", "false").lower() == "true"
+# Read here rather than imported, so maintenance never touches the memory store
+MEMORY_DB_PATH = os.getenv("MEMORY_DB_PATH", "./db/memory.sqlite3")
+SCAN_BATCH_SIZE = 1000
+DELETE_BATCH_SIZE = 500
+SQLITE_FILES = (
+    os.path.join(PERSIST_DIR, "chroma.sqlite3"),
+    MEMORY_DB_PATH,
+    EMBEDDING_CACHE_PATH
+)
+
+
+def retention_policy():
+    """Per-type retention in days, from RETENTION_DAYS or the defaults"""
+    policy = dict(DEFAULT_RETENTION_DAYS)
+    for part in os.getenv("RETENTION_DAYS", "").split(","):
+        if "=" in part:
+            entry_type, days = part.split("=", 1)
+            policy[entry_type.strip()] = float(days)
+    return policy
+
+def _entry_time(metadata):
+    if isinstance(metadata.get("ts"), (int, float)):
+        return metadata["ts"]
+    if metadata.get("timestamp"):
+        return timestamp_to_ts(metadata["timestamp"])
+    return None
+
+def _file_size(path):
+    total = 0
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            total += os.path.getsize(path + suffix)
+    return total
+
+
+# -----------------------
+# Maintenance Steps
+# -----------------------
+def find_expired_and_duplicates(collection, policy, now=None):
+    """
+    Scan a collection and return (expired_ids, duplicate_ids).
+
+    Duplicates are entries with the same user, type and normalized content
+    saved within the same time bucket (the key behind write_queue.entry_id),
+    so the same mood logged on different days is kept. The oldest copy is
+    kept; entries without a time are never treated as duplicates.
+    """
+    now = now or time.time()
+    expired, duplicates = [], []
+    first_seen = {}
+    total = collection.count()
+
+    for offset in range(0, total, SCAN_BATCH_SIZE):
+        page = collection.get(limit=SCAN_BATCH_SIZE, offset=offset, include=["documents", "metadatas"])
+        for doc_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+            metadata = metadata or {}
+            created = _entry_time(metadata)
+            days = policy.get(metadata.get("type"), 0)
+            if days and created is not None and created < now - days * 86400:
+                expired.append(doc_id)
+                continue
+
+            if created is None:
+                continue
+            key = entry_id(metadata.get("user"), metadata.get("type"), document or "", created)
+            if key not in first_seen:
+                first_seen[key] = (doc_id, created)
+                continue
+            kept_id, kept_created = first_seen[key]
+            if created < kept_created:
+                first_seen[key] = (doc_id, created)
+                duplicates.append(kept_id)
+            else:
+                duplicates.append(doc_id)
+    return expired, duplicates
+
+def delete_ids(collection, ids):
+    # Through the Chroma API so the vector index drops them as well
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        collection.delete(ids=ids[start:start + DELETE_BATCH_SIZE])
+
+def purge_response_cache(client, ttl=CACHE_TTL_SECONDS):
+    """Delete expired semantic response cache entries; returns how many were removed"""
+    try:
+        collection = client.get_collection(RESPONSE_CACHE_COLLECTION)
+    except Exception:
+        return 0
+    before = collection.count()
+    collection.delete(where={"created": {"$lt": time.time() - ttl}})
+    return before - collection.count()
+
+def optimize_sqlite(path, vacuum=True):
+    """ANALYZE (and optionally VACUUM) one SQLite file; returns bytes reclaimed"""
+    if not os.path.exists(path):
+        return 0
+    before = _file_size(path)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("ANALYZE")
+        if vacuum:
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return before - _file_size(path)
+
+
+def run_maintenance(vacuum=True, dry_run=False, policy=None):
+    """Run every maintenance step and return a report dict"""
+    policy = policy or retention_policy()
+    report = {'collections': {}, 'files': {}, 'timings': {}, 'errors': []}
+    started = time.time()
+    client = get_chroma_client()
+
+    step = time.time()
+    for name in partition_collection_names(client):
+        try:
+            collection = client.get_collection(name)
+            expired, duplicates = find_expired_and_duplicates(collection, policy)
+            if not dry_run:
+                delete_ids(collection, expired + duplicates)
+            report['collections'][name] = {'expired': len(expired), 'duplicates': len(duplicates)}
+        except Exception as e:
+            report['errors'].append(f"{name}: {e}")
+    report['timings']['retention_dedup'] = round(time.time() - step, 2)
+
+    step = time.time()
+    try:
+        report['response_cache_purged'] = 0 if dry_run else purge_response_cache(client)
+    except Exception as e:
+        report['errors'].append(f"response cache: {e}")
+    report['timings']['response_cache'] = round(time.time() - step, 2)
+
+    if not dry_run:
+        step = time.time()
+        for path in SQLITE_FILES:
+            try:
+                report['files'][path] = {'reclaimed_bytes': optimize_sqlite(path, vacuum=vacuum), 'size_bytes': _file_size(path)}
+            except Exception as e:
+                # Usually "database is locked" while the app is writing
+                report['errors'].append(f"{path}: {e}")
+        report['timings']['sqlite'] = round(time.time() - step, 2)
+
+    report['timings']['total'] = round(time.time() - started, 2)
+    return report
+
+def print_report(report):
+    for name, counts in report['collections'].items():
+        print(f"{name}: {counts['expired']} expired, {counts['duplicates']} duplicates removed")
+    print(f"Response cache: {report.get('response_cache_purged', 0)} expired entries removed")
+    for path, info in report['files'].items():
+        print(f"{path}: {info['reclaimed_bytes'] / 1024:.1f} KB reclaimed, now {info['size_bytes'] / 1024:.1f} KB")
+    print("Timings: " + ", ".join(f"{step} {seconds}s" for step, seconds in report['timings'].items()))
+    for error in report['errors']:
+        print(f"Error: {error}")
+
+
+# -----------------------
+# Scheduled Maintenance
+# -----------------------
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def start_maintenance_scheduler(interval_hours=MAINTENANCE_INTERVAL_HOURS, vacuum=MAINTENANCE_VACUUM):
+    """Run maintenance every `interval_hours` in a daemon thread (once per process)"""
+    global _scheduler
+    if interval_hours <= 0:
+        return False
+    with _scheduler_lock:
+        if _scheduler is not None and _scheduler.is_alive():
+            return True
+
+        def _loop():
+            while True:
+                time.sleep(interval_hours * 3600)
+                try:
+                    print_report(run_maintenance(vacuum=vacuum))
+                except Exception as e:
+                    print(f"Scheduled maintenance failed: {e}")
+
+        _scheduler = threading.Thread(target=_loop)
+        _scheduler.daemon = True
+        _scheduler.start()
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retention, de-duplication and compaction for the wellness stores")
+    parser.add_argument("--no-vacuum", action="store_true", help="Only ANALYZE the SQLite files")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without deleting")
+    args = parser.parse_args(argv)
+    print_report(run_maintenance(vacuum=not args.no_vacuum, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
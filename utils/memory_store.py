@@ -0,0 +1,310 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# -----------------------
+# Memory Store Configuration
+# -----------------------
+MEMORY_DB_PATH = os.getenv("MEMORY_DB_PATH", "./db/memory.sqlite3")
+MAX_USERS_IN_RAM = int(os.getenv("MEMORY_MAX_USERS", "500"))
+IDLE_TTL_SECONDS = int(os.getenv("MEMORY_IDLE_TTL", "3600"))
+MAX_MESSAGES_ON_DISK = int(os.getenv("MEMORY_MAX_MESSAGES", "200"))
+FLUSH_INTERVAL_SECONDS = 30
+
+# Single-character roles keep the persisted rows small
+_ROLE_CODES = {'human': 'h', 'ai': 'a'}
+_ROLE_NAMES = {'h': 'human', 'a': 'ai'}
+
+
+class CompactMessage:
+    """Minimal chat message with the `type`/`content` attributes the app reads"""
+    __slots__ = ('type', 'content')
+
+    def __init__(self, type, content):
+        self.type = type
+        self.content = content
+
+
+class CompactChatHistory:
+    __slots__ = ('messages',)
+
+    def __init__(self):
+        self.messages = []
+
+
+class CompactMemory:
+    """
+    Lightweight stand-in for ConversationBufferMemory.
+
+    Implements the subset of the API used by the app (`chat_memory.messages`
+    and `save_context`) with slotted message objects instead of full
+    LangChain message models.
+    """
+
+    def __init__(self, memory_key="chat_history", return_messages=True):
+        self.memory_key = memory_key
+        self.return_messages = return_messages
+        self.chat_memory = CompactChatHistory()
+
+    def save_context(self, inputs, outputs):
+        self.chat_memory.messages.append(CompactMessage('human', list(inputs.values())[0]))
+        self.chat_memory.messages.append(CompactMessage('ai', list(outputs.values())[0]))
+
+    def clear(self):
+        self.chat_memory.messages = []
+
+
+def _memory_messages(memory):
+    chat_memory = getattr(memory, 'chat_memory', None)
+    return getattr(chat_memory, 'messages', None) or []
+
+
+class SQLiteMemoryBackend:
+    """Spill-to-disk persistence with one compact row per message"""
+
+    def __init__(self, path=MEMORY_DB_PATH, max_messages=MAX_MESSAGES_ON_DISK):
+        self.path = path
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS memory_messages (
+                user_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (user_id, seq)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS memory_users (
+                user_id TEXT PRIMARY KEY,
+                last_seen REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def load(self, user_id):
+        """Return (first_seq, [(role, content), ...]) for a user, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, role, content FROM memory_messages WHERE user_id = ? ORDER BY seq",
+                (user_id,)
+            ).fetchall()
+        first_seq = rows[0][0] if rows else 0
+        return first_seq, [(_ROLE_NAMES.get(role, role), content) for _, role, content in rows]
+
+    def append(self, user_id, start_seq, messages):
+        """Persist messages numbered from start_seq and trim old history"""
+        rows = [
+            (user_id, start_seq + offset, _ROLE_CODES.get(role, role), content)
+            for offset, (role, content) in enumerate(messages)
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO memory_messages (user_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO memory_users (user_id, last_seen) VALUES (?, ?)",
+                    (user_id, time.time())
+                )
+                if self.max_messages:
+                    self._conn.execute(
+                        "DELETE FROM memory_messages WHERE user_id = ? AND seq < ?",
+                        (user_id, start_seq + len(messages) - self.max_messages)
+                    )
+
+    def delete(self, user_id):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM memory_messages WHERE user_id = ?", (user_id,))
+                self._conn.execute("DELETE FROM memory_users WHERE user_id = ?", (user_id,))
+
+
+class _StoreEntry:
+    __slots__ = ('memory', 'last_access', 'persisted', 'base_seq')
+
+    def __init__(self, memory, persisted, base_seq):
+        self.memory = memory
+        self.last_access = time.time()
+        # Number of in-RAM messages already written to the backend
+        self.persisted = persisted
+        # Disk sequence number of the first in-RAM message
+        self.base_seq = base_seq
+
+
+class MemoryStore:
+    """
+    Bounded per-user conversation memory.
+
+    Keeps at most `max_users` memories in RAM (least recently used are
+    evicted first, as are memories idle for longer than `ttl`). Evicted and
+    periodically flushed memories are written to the backend, and a user
+    whose memory was evicted gets their history back on the next lookup.
+    """
+
+    def __init__(self, memory_factory=CompactMemory, backend=None,
+                 max_users=MAX_USERS_IN_RAM, ttl=IDLE_TTL_SECONDS,
+                 flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.memory_factory = memory_factory
+        self.backend = backend
+        self.max_users = max_users
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._flusher = None
+        self._load_listeners = []
+        if backend is not None and flush_interval:
+            self._start_flusher(flush_interval)
+
+    def get(self, user_id):
+        """Get or create conversation memory for a user"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.last_access = time.time()
+                self._entries.move_to_end(user_id)
+                return entry.memory
+
+            memory = self.memory_factory(memory_key="chat_history", return_messages=True)
+            first_seq, history = self.backend.load(user_id) if self.backend else (0, [])
+            # Disk trimming may have cut an exchange in half
+            if history and history[0][0] != 'human':
+                history = history[1:]
+                first_seq += 1
+            self._restore(memory, history)
+            self._entries[user_id] = _StoreEntry(memory, len(_memory_messages(memory)), first_seq)
+            self._evict_locked()
+            self._notify_load(user_id)
+            return memory
+
+    def add_load_listener(self, callback):
+        """Call `callback(user_id)` whenever a user's memory is (re)built, e.g. from disk"""
+        with self._lock:
+            if callback not in self._load_listeners:
+                self._load_listeners.append(callback)
+
+    def save_context(self, user_id, inputs, outputs):
+        """
+        Save an exchange to the user's live memory and return that memory.
+        A memory object fetched earlier may have been evicted since, and
+        anything saved to it would never be persisted.
+        """
+        with self._lock:
+            memory = self.get(user_id)
+            memory.save_context(inputs, outputs)
+            return memory
+
+    def __contains__(self, user_id):
+        with self._lock:
+            return user_id in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def persist(self, user_id):
+        """Write any unsaved messages for one user to the backend"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._persist_entry(user_id, entry)
+
+    def flush(self):
+        """Persist every in-RAM memory and drop the ones that are idle"""
+        with self._lock:
+            for user_id, entry in list(self._entries.items()):
+                self._persist_entry(user_id, entry)
+            self._evict_locked()
+
+    def forget(self, user_id):
+        """Remove a user's memory from RAM and disk"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            if self.backend:
+                self.backend.delete(user_id)
+
+    def _restore(self, memory, history):
+        # Rebuild through save_context so any memory implementation works
+        for i in range(0, len(history) - 1, 2):
+            (_, user_text), (_, ai_text) = history[i], history[i + 1]
+            memory.save_context({"input": user_text}, {"output": ai_text})
+
+    def _notify_load(self, user_id):
+        for callback in self._load_listeners:
+            try:
+                callback(user_id)
+            except Exception as e:
+                print(f"Memory load listener failed: {e}")
+
+    def _persist_entry(self, user_id, entry):
+        if self.backend is None:
+            return
+        messages = _memory_messages(entry.memory)
+        if len(messages) <= entry.persisted:
+            return
+        new_messages = [(msg.type, msg.content) for msg in messages[entry.persisted:]]
+        try:
+            self.backend.append(user_id, entry.base_seq + entry.persisted, new_messages)
+            entry.persisted = len(messages)
+        except Exception as e:
+            print(f"Memory persistence failed for {user_id}: {e}")
+
+    def _evict_locked(self):
+        now = time.time()
+        for user_id, entry in list(self._entries.items()):
+            if now - entry.last_access <= self.ttl:
+                break
+            self._persist_entry(user_id, entry)
+            del self._entries[user_id]
+        while len(self._entries) > self.max_users:
+            user_id, entry = self._entries.popitem(last=False)
+            self._persist_entry(user_id, entry)
+
+    def _start_flusher(self, interval):
+        def _run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Memory flush failed: {e}")
+
+        self._flusher = threading.Thread(target=_run)
+        self._flusher.daemon = True
+        self._flusher.start()
+        atexit.register(self.flush)
+
+
+def create_memory_store(memory_factory=CompactMemory):
+    """Create a store with SQLite persistence, or RAM only if that fails"""
+    try:
+        backend = SQLiteMemoryBackend()
+    except Exception as e:
+        print(f"Memory persistence disabled: {e}")
+        backend = None
+    return MemoryStore(memory_factory=memory_factory, backend=backend)
+
+
+# Global memory store instance, shared by every Streamlit session in the process.
+# Built on first use so importing this module never opens the database.
+_memory_store = None
+_memory_store_lock = threading.Lock()
+
+
+def get_memory_store(memory_factory=CompactMemory):
+    """Return the shared store, creating it on first call with memory_factory"""
+    global _memory_store
+    if _memory_store is None:
+        with _memory_store_lock:
+            if _memory_store is None:
+                _memory_store = create_memory_store(memory_factory)
+    return _memory_store
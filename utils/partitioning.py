@@ -0,0 +1,180 @@
+import argparse
+import datetime
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utils.resources import COLLECTION_NAME, get_chroma_client, get_embeddings, get_vectorstore
+
+
+# -----------------------
+# Partitioning Configuration
+# -----------------------
+# "shared": one collection for everybody (original layout)
+# "per_user": one collection per user
+# "sharded": users hashed into CHROMA_SHARDS collections
+CHROMA_LAYOUT = os.getenv("CHROMA_LAYOUT", "shared")
+CHROMA_SHARDS = int(os.getenv("CHROMA_SHARDS", "16"))
+MAX_OPEN_PARTITIONS = 256
+MIGRATION_BATCH_SIZE = 500
+LAYOUTS = ('shared', 'per_user', 'sharded')
+
+
+def _user_hash(user_id):
+    return hashlib.sha1(str(user_id).encode('utf-8')).hexdigest()
+
+def collection_name_for(user_id, layout=None, shards=None):
+    """Name of the collection holding a user's entries under the given layout"""
+    layout = layout or CHROMA_LAYOUT
+    if layout == 'shared' or not user_id:
+        return COLLECTION_NAME
+    if layout == 'per_user':
+        # Hashed so the name is always a valid Chroma collection name
+        return f"{COLLECTION_NAME}_u_{_user_hash(user_id)[:16]}"
+    if layout == 'sharded':
+        shard = int(_user_hash(user_id), 16) % (shards or CHROMA_SHARDS)
+        return f"{COLLECTION_NAME}_s{shard:03d}"
+    raise ValueError(f"Unknown CHROMA_LAYOUT: {layout}")
+
+def partition_collection_names(client=None):
+    """All existing collections that belong to the wellness store"""
+    client = client or get_chroma_client()
+    names = []
+    for collection in client.list_collections():
+        name = collection if isinstance(collection, str) else collection.name
+        if "__" in name:
+            # Re-embedding targets and swapped-out copies
+            continue
+        if name == COLLECTION_NAME or name.startswith(f"{COLLECTION_NAME}_u_") or name.startswith(f"{COLLECTION_NAME}_s"):
+            names.append(name)
+    return names
+
+
+_open_partitions = OrderedDict()
+_partitions_lock = threading.Lock()
+
+def get_user_vectorstore(user_id, create=True):
+    """
+    Vectorstore for the partition holding `user_id` (the shared one by default).
+    With create=False a partition that doesn't exist yet gives None instead of
+    being created empty, so reads for users who never wrote add no collections.
+    """
+    name = collection_name_for(user_id)
+    if name == COLLECTION_NAME:
+        return get_vectorstore()
+
+    client = get_chroma_client()
+    with _partitions_lock:
+        entry = _open_partitions.get(name)
+        # Rebuilt if the registry was reset and the client replaced
+        if entry is not None and entry[0] is client:
+            _open_partitions.move_to_end(name)
+            return entry[1]
+
+        if not create:
+            try:
+                client.get_collection(name)
+            except Exception:
+                return None
+
+        from langchain_community.vectorstores import Chroma
+        # All partitions share one Chroma client and one embeddings object
+        store = Chroma(
+            client=client,
+            collection_name=name,
+            embedding_function=get_embeddings()
+        )
+        _open_partitions[name] = (client, store)
+        while len(_open_partitions) > MAX_OPEN_PARTITIONS:
+            _open_partitions.popitem(last=False)
+        return store
+
+
+# -----------------------
+# Migration Helpers
+# -----------------------
+def timestamp_to_ts(timestamp):
+    """Convert the stored `timestamp` string to an integer epoch for range filters"""
+    try:
+        return int(datetime.datetime.fromisoformat(str(timestamp)).timestamp())
+    except ValueError:
+        return None
+
+
+# -----------------------
+# Migration Tool
+# -----------------------
+def migrate(layout, source=COLLECTION_NAME, batch_size=MIGRATION_BATCH_SIZE, drop_source=False, dry_run=False):
+    """
+    Copy entries from `source` into the collections of `layout`.
+
+    Stored embeddings are reused (nothing is re-embedded), entries keep
+    their ids so the copy can be re-run safely, and an integer `ts`
+    metadata field is added for fast timestamp filters.
+    """
+    client = get_chroma_client()
+    source_collection = client.get_collection(source)
+    total = source_collection.count()
+    started = time.time()
+    copied = 0
+    targets = {}
+    print(f"Migrating {total} entries from '{source}' to layout '{layout}'")
+
+    for offset in range(0, total, batch_size):
+        page = source_collection.get(
+            limit=batch_size,
+            offset=offset,
+            include=["documents", "metadatas", "embeddings"]
+        )
+        groups = {}
+        for doc_id, document, metadata, embedding in zip(page["ids"], page["documents"], page["metadatas"], page["embeddings"]):
+            metadata = dict(metadata or {})
+            if "ts" not in metadata and metadata.get("timestamp"):
+                ts = timestamp_to_ts(metadata["timestamp"])
+                if ts is not None:
+                    metadata["ts"] = ts
+            name = collection_name_for(metadata.get("user"), layout=layout)
+            group = groups.setdefault(name, {"ids": [], "documents": [], "metadatas": [], "embeddings": []})
+            group["ids"].append(doc_id)
+            group["documents"].append(document)
+            group["metadatas"].append(metadata)
+            group["embeddings"].append(list(embedding))
+
+        for name, group in groups.items():
+            targets[name] = targets.get(name, 0) + len(group["ids"])
+            if dry_run:
+                continue
+            client.get_or_create_collection(name).upsert(**group)
+        copied += len(page["ids"])
+        print(f"  {copied}/{total} entries")
+
+    if drop_source and not dry_run and source not in targets:
+        client.delete_collection(source)
+        print(f"Dropped source collection '{source}'")
+
+    elapsed = time.time() - started
+    print(f"Done: {copied} entries into {len(targets)} collections in {elapsed:.1f}s")
+    return targets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partition the wellness Chroma store by user")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Copy the shared collection into a partitioned layout")
+    migrate_parser.add_argument("--layout", choices=LAYOUTS[1:], default="per_user")
+    migrate_parser.add_argument("--source", default=COLLECTION_NAME)
+    migrate_parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE)
+    migrate_parser.add_argument("--drop-source", action="store_true", help="Delete the source collection afterwards")
+    migrate_parser.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        migrate(args.layout, args.source, args.batch_size, args.drop_source, args.dry_run)
+        print(f"Set CHROMA_LAYOUT={args.layout} to use the new layout")
+
+
+if __name__ == "__main__":
+    main()
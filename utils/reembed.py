@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.partitioning import partition_collection_names
+from utils.resources import COLLECTION_NAME, EMBEDDING_MODEL, build_embeddings, get_chroma_client
+
+
+# -----------------------
+# Re-embedding Configuration
+# -----------------------
+REEMBED_BATCH_SIZE = 100
+REEMBED_CONCURRENCY = 4
+# Embedding requests per second across all workers (0 = unlimited)
+REEMBED_RATE_LIMIT = 2.0
+CHECKPOINT_DIR = "./db"
+MAX_RETRIES = 5
+RETRY_BACKOFF_SECONDS = 2.0
+# Catch-up passes after the main copy, for writes that landed during the run
+MAX_CATCH_UP_PASSES = 3
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.time()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+# -----------------------
+# Checkpoints
+# -----------------------
+def checkpoint_path(source, target):
+    return os.path.join(CHECKPOINT_DIR, f"reembed_{source}_to_{target}.json")
+
+def load_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(path, state):
+    # Write-then-rename so an interrupted run never leaves a torn checkpoint
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+# -----------------------
+# Collection Swap
+# -----------------------
+def swap_collections(source, target, client=None):
+    """
+    Give `target` the name `source` and keep the old one as `<source>__old_<time>`.
+
+    Renames go through Chroma's collection.modify. Between the two renames
+    the name is briefly free, so run the swap with app writes paused.
+    Running app processes hold collections by id and must be restarted to
+    pick up the new one.
+    """
+    client = client or get_chroma_client()
+    source_collection = client.get_collection(source)
+    target_collection = client.get_collection(target)
+    old_name = f"{source}__old_{int(time.time())}"
+    source_collection.modify(name=old_name)
+    try:
+        target_collection.modify(name=source)
+    except Exception:
+        # Put the original back so the app never loses its collection
+        source_collection.modify(name=source)
+        raise
+    return old_name
+
+
+# -----------------------
+# Re-embedding
+# -----------------------
+def _embed_batch(embeddings, limiter, documents):
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.wait()
+        try:
+            return embeddings.embed_documents(documents)
+        except Exception as e:
+            if attempt == MAX_RETRIES:
+                raise
+            print(f"  embedding failed ({e}), retrying")
+            time.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+def _all_ids(collection, batch_size):
+    ids = set()
+    offset = 0
+    while True:
+        page = collection.get(limit=batch_size, offset=offset, include=[])
+        if not page["ids"]:
+            return ids
+        ids.update(page["ids"])
+        offset += len(page["ids"])
+
+def catch_up(source_collection, target_collection, embeddings, limiter, batch_size):
+    """
+    Sync `target` with `source` by id: copy documents the offset pages missed
+    (or that were added during the run) and drop ones deleted since.
+    Returns (added, removed).
+    """
+    source_ids = _all_ids(source_collection, batch_size)
+    target_ids = _all_ids(target_collection, batch_size)
+    missing = sorted(source_ids - target_ids)
+    stale = sorted(target_ids - source_ids)
+    for start in range(0, len(missing), batch_size):
+        page = source_collection.get(ids=missing[start:start + batch_size], include=["documents", "metadatas"])
+        if not page["ids"]:
+            continue
+        vectors = _embed_batch(embeddings, limiter, [doc or "" for doc in page["documents"]])
+        target_collection.upsert(ids=page["ids"], embeddings=vectors, documents=page["documents"], metadatas=page["metadatas"])
+    for start in range(0, len(stale), batch_size):
+        target_collection.delete(ids=stale[start:start + batch_size])
+    return len(missing), len(stale)
+
+def reembed_collection(source, target=None, model=EMBEDDING_MODEL, batch_size=REEMBED_BATCH_SIZE,
+                       concurrency=REEMBED_CONCURRENCY, rate=REEMBED_RATE_LIMIT, swap=False, restart=False):
+    """
+    Re-embed every document of `source` into `target`, resuming from a checkpoint.
+
+    Pages are read sequentially and embedded by `concurrency` workers under
+    a shared rate limit. The checkpoint records the offset below which every
+    page has been written, so a resumed run redoes at most `concurrency`
+    pages, which upserts make harmless. Offset paging over a collection that
+    is still being written can skip documents, so catch-up passes by id
+    follow until both collections hold the same ids.
+    """
+    target = target or f"{source}__reembed"
+    client = get_chroma_client()
+    source_collection = client.get_collection(source)
+    target_collection = client.get_or_create_collection(target, metadata=source_collection.metadata)
+    embeddings = build_embeddings(model)
+    limiter = RateLimiter(rate)
+
+    path = checkpoint_path(source, target)
+    state = None if restart else load_checkpoint(path)
+    if state is None or state.get("model") != model:
+        state = {"source": source, "target": target, "model": model, "offset": 0, "written": 0}
+    total = source_collection.count()
+    print(f"Re-embedding '{source}' -> '{target}' with {model}: {total} documents, starting at {state['offset']}")
+
+    started = time.time()
+    written_this_run = 0
+    next_offset = state["offset"]
+    in_flight = {}
+    completed = set()
+
+    def process(offset):
+        page = source_collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+        if not page["ids"]:
+            return 0
+        vectors = _embed_batch(embeddings, limiter, [doc or "" for doc in page["documents"]])
+        target_collection.upsert(ids=page["ids"], embeddings=vectors, documents=page["documents"], metadatas=page["metadatas"])
+        return len(page["ids"])
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while next_offset < total or in_flight:
+            while next_offset < total and len(in_flight) < concurrency:
+                in_flight[executor.submit(process, next_offset)] = next_offset
+                next_offset += batch_size
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                offset = in_flight.pop(future)
+                # Propagates after retries are exhausted; the checkpoint allows resuming
+                count = future.result()
+                completed.add(offset)
+                written_this_run += count
+                state["written"] += count
+
+            # Advance the checkpoint over the contiguous run of finished pages
+            while state["offset"] in completed:
+                completed.discard(state["offset"])
+                state["offset"] += batch_size
+            save_checkpoint(path, state)
+
+            elapsed = max(time.time() - started, 1e-6)
+            print(f"  {min(state['offset'], total)}/{total} documents, {written_this_run / elapsed:.1f} docs/sec")
+
+    for _ in range(MAX_CATCH_UP_PASSES):
+        added, removed = catch_up(source_collection, target_collection, embeddings, limiter, batch_size)
+        written_this_run += added
+        if not added and not removed:
+            break
+        print(f"  catch-up: {added} documents added, {removed} removed")
+    else:
+        if swap:
+            raise RuntimeError(f"'{source}' is still changing; pause app writes and run again to swap")
+        print(f"Warning: '{source}' is still changing; run again with app writes paused")
+
+    elapsed = max(time.time() - started, 1e-6)
+    report = {
+        'source': source,
+        'target': target,
+        'documents': written_this_run,
+        'seconds': round(elapsed, 1),
+        'docs_per_second': round(written_this_run / elapsed, 1)
+    }
+    if swap:
+        report['previous'] = swap_collections(source, target, client)
+        print(f"Swapped: '{source}' now holds the new embeddings, previous kept as '{report['previous']}'")
+    if os.path.exists(path):
+        os.remove(path)
+    print(f"Done: {report['documents']} documents in {report['seconds']}s ({report['docs_per_second']} docs/sec)")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-embed a Chroma collection into a new collection, resumably")
+    parser.add_argument("--source", default=COLLECTION_NAME)
+    parser.add_argument("--all-partitions", action="store_true", help="Re-embed every wellness collection")
+    parser.add_argument("--target", help="Target collection (default <source>__reembed)")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help='Gemini model name or "local-hashing[-<dims>]"')
+    parser.add_argument("--batch-size", type=int, default=REEMBED_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=REEMBED_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=REEMBED_RATE_LIMIT, help="Embedding requests per second (0 = unlimited)")
+    parser.add_argument("--swap", action="store_true", help="Swap the new collection in under the source name when done")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args(argv)
+
+    if args.all_partitions and args.target:
+        parser.error("--target cannot be combined with --all-partitions")
+    sources = partition_collection_names() if args.all_partitions else [args.source]
+    for source in sources:
+        reembed_collection(source, args.target, args.model, args.batch_size, args.concurrency,
+                           args.rate, args.swap, args.restart)
+    if args.swap:
+        print(f"Set EMBEDDING_MODEL={args.model} and restart the app to query with the new model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+
+from utils.local_embeddings import HashingEmbeddings, dimensions_for, is_local_model
+
+
+# -----------------------
+# Resource Configuration
+# -----------------------
+PERSIST_DIR = "./db/chroma"
+COLLECTION_NAME = "mental_wellness_chat"
+# A Gemini model name, or "local-hashing[-<dims>]" for the offline CPU backend
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/embedding-001")
+# The semantic response cache only needs near-duplicate matching, so it can
+# use the local backend while retrieval keeps Gemini embeddings
+RESPONSE_CACHE_EMBEDDING_MODEL = os.getenv("RESPONSE_CACHE_EMBEDDING_MODEL", EMBEDDING_MODEL)
+# Vectors of different backends can't share a collection
+RESPONSE_CACHE_COLLECTION = "response_cache_local" if is_local_model(RESPONSE_CACHE_EMBEDDING_MODEL) else "response_cache"
+LLM_MODEL = "gemini-2.5-flash"
+LLM_TEMPERATURE = 0.7
+# A resource that failed to build is retried after this many seconds
+RESOURCE_RETRY_SECONDS = float(os.getenv("RESOURCE_RETRY_SECONDS", "30"))
+
+
+class ResourceRegistry:
+    """
+    Process-wide registry of expensive shared resources.
+
+    Streamlit re-executes app.py on every interaction, but imported modules
+    are only loaded once per process, so resources built here (and the HTTP
+    connection pools inside them) are shared by every session. Each resource
+    is built lazily by its factory, at most once, until it is reset. A failed
+    build is remembered for RESOURCE_RETRY_SECONDS and then retried.
+    """
+
+    def __init__(self, retry_seconds=RESOURCE_RETRY_SECONDS):
+        self.retry_seconds = retry_seconds
+        self._factories = {}
+        self._health_checks = {}
+        self._instances = {}
+        self._errors = {}
+        self._created_at = {}
+        # Guards the dicts above; each resource is built under its own lock,
+        # so a slow build never blocks the others
+        self._lock = threading.RLock()
+        self._build_locks = {}
+
+    def register(self, name, factory, health_check=None):
+        """Register a factory (and optional health check) for a resource"""
+        with self._lock:
+            self._factories[name] = factory
+            if health_check is not None:
+                self._health_checks[name] = health_check
+
+    def get(self, name):
+        """Return the shared instance, building it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"Unknown resource: {name}")
+            build_lock = self._build_locks.setdefault(name, threading.RLock())
+
+        with build_lock:
+            with self._lock:
+                if name in self._instances:
+                    return self._instances[name]
+                if name in self._errors:
+                    error, failed_at = self._errors[name]
+                    # Don't hammer a failing backend on every rerun, but retry after a while
+                    if time.time() - failed_at < self.retry_seconds:
+                        raise error
+                    del self._errors[name]
+                factory = self._factories[name]
+
+            try:
+                instance = factory()
+            except Exception as e:
+                with self._lock:
+                    self._errors[name] = (e, time.time())
+                raise
+
+            with self._lock:
+                self._instances[name] = instance
+                self._created_at[name] = time.time()
+            return instance
+
+    def reset(self, name=None):
+        """Drop one resource (or all of them) so it is rebuilt on next use"""
+        with self._lock:
+            names = [name] if name is not None else list(self._factories)
+            for resource_name in names:
+                self._instances.pop(resource_name, None)
+                self._errors.pop(resource_name, None)
+                self._created_at.pop(resource_name, None)
+
+    def health(self, probe=False):
+        """
+        Return a status dict for every registered resource.
+        Health checks (which may hit the backend) only run when probe is set.
+        """
+        status = {}
+        with self._lock:
+            names = list(self._factories)
+
+        for name in names:
+            entry = {
+                'initialized': name in self._instances,
+                'healthy': None,
+                'error': None,
+                'age_seconds': None
+            }
+            if name in self._errors:
+                entry['healthy'] = False
+                entry['error'] = str(self._errors[name][0])
+            elif name in self._instances:
+                entry['age_seconds'] = round(time.time() - self._created_at[name], 1)
+                if probe:
+                    check = self._health_checks.get(name)
+                    try:
+                        entry['healthy'] = bool(check(self._instances[name])) if check else True
+                    except Exception as e:
+                        entry['healthy'] = False
+                        entry['error'] = str(e)
+            status[name] = entry
+        return status
+
+
+# -----------------------
+# Resource Factories
+# -----------------------
+def _load_api_key():
+    from dotenv import load_dotenv
+    load_dotenv()
+    api_key = os.getenv("GENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("GENAI_API_KEY is not set")
+    return api_key
+
+def build_embeddings(model):
+    """Embeddings for a model name (local backends need no API key or network)"""
+    if is_local_model(model):
+        return HashingEmbeddings(dimensions=dimensions_for(model))
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    from utils.embedding_cache import with_embedding_cache
+    embeddings = GoogleGenerativeAIEmbeddings(model=model, google_api_key=get_api_key())
+    # Repeated strings are embedded once and served from RAM/disk afterwards
+    return with_embedding_cache(embeddings, namespace=model)
+
+def _build_embeddings():
+    return build_embeddings(EMBEDDING_MODEL)
+
+def _build_response_cache_embeddings():
+    if RESPONSE_CACHE_EMBEDDING_MODEL == EMBEDDING_MODEL:
+        return get_embeddings()
+    return build_embeddings(RESPONSE_CACHE_EMBEDDING_MODEL)
+
+def _build_chroma_client():
+    import chromadb
+    # One client (and one SQLite connection pool) for every collection
+    return chromadb.PersistentClient(path=PERSIST_DIR)
+
+def _build_vectorstore():
+    from langchain_community.vectorstores import Chroma
+    return Chroma(
+        client=get_chroma_client(),
+        collection_name=COLLECTION_NAME,
+        embedding_function=get_embeddings()
+    )
+
+def _build_response_cache_store():
+    from langchain_community.vectorstores import Chroma
+    return Chroma(
+        client=get_chroma_client(),
+        collection_name=RESPONSE_CACHE_COLLECTION,
+        embedding_function=registry.get('response_cache_embeddings')
+    )
+
+def _build_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=LLM_MODEL,
+        temperature=LLM_TEMPERATURE,
+        google_api_key=get_api_key()
+    )
+
+def _check_vectorstore(vectorstore):
+    vectorstore._collection.count()
+    return True
+
+
+# Global registry instance
+registry = ResourceRegistry()
+registry.register('api_key', _load_api_key)
+registry.register('embeddings', _build_embeddings)
+registry.register('response_cache_embeddings', _build_response_cache_embeddings)
+registry.register('chroma_client', _build_chroma_client)
+registry.register('vectorstore', _build_vectorstore, health_check=_check_vectorstore)
+registry.register('response_cache_store', _build_response_cache_store, health_check=_check_vectorstore)
+registry.register('llm', _build_llm)
+
+def get_api_key():
+    """Return the Gemini API key, or None if it is not configured"""
+    try:
+        return registry.get('api_key')
+    except RuntimeError:
+        registry.reset('api_key')
+        return None
+
+def get_embeddings():
+    return registry.get('embeddings')
+
+def get_chroma_client():
+    return registry.get('chroma_client')
+
+def get_vectorstore():
+    return registry.get('vectorstore')
+
+def get_response_cache_store():
+    return registry.get('response_cache_store')
+
+def get_llm():
+    return registry.get('llm')
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import random
+import threading
+import time
+
+
+# -----------------------
+# Response Cache Configuration
+# -----------------------
+SIMILARITY_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92"))
+CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL", str(24 * 60 * 60)))
+# Distinct responses kept per prompt; until the pool is full some requests
+# still go to the LLM so users don't all see the same text
+VARIATION_POOL_SIZE = int(os.getenv("RESPONSE_CACHE_VARIANTS", "5"))
+MAX_EXACT_KEYS = 2000
+PURGE_EVERY_N_STORES = 200
+
+
+def normalize_prompt(text):
+    return " ".join(text.lower().split())
+
+def make_cache_key(user_input, language, context_type):
+    raw = f"{language}|{context_type}|{normalize_prompt(user_input)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache in front of the LLM.
+
+    The exact tier is an in-process dict keyed by a hash of the normalized
+    prompt, language and context type. The semantic tier is a dedicated
+    Chroma collection searched by similarity (filtered by language and
+    context type), so near-identical prompts from other users also hit.
+    Each key holds a small pool of response variants.
+    """
+
+    def __init__(self, store_factory=None, threshold=SIMILARITY_THRESHOLD,
+                 ttl=CACHE_TTL_SECONDS, pool_size=VARIATION_POOL_SIZE):
+        self.store_factory = store_factory
+        self.threshold = threshold
+        self.ttl = ttl
+        self.pool_size = pool_size
+        self._exact = {}
+        self._lock = threading.Lock()
+        self._stores_since_purge = 0
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _store(self):
+        if self.store_factory is None:
+            return None
+        try:
+            return self.store_factory()
+        except Exception as e:
+            print(f"Response cache store unavailable: {e}")
+            return None
+
+    def lookup(self, user_input, language, context_type):
+        """Return a cached response or None if the LLM should be called"""
+        key = make_cache_key(user_input, language, context_type)
+        now = time.time()
+
+        with self._lock:
+            variants = [v for v in self._exact.get(key, []) if now - v[1] < self.ttl]
+            if variants:
+                self._exact[key] = variants
+
+        if not variants:
+            variants = self._semantic_lookup(user_input, language, context_type, now)
+            if variants:
+                with self._lock:
+                    self._exact[key] = variants
+                self.semantic_hits += 1
+
+        if not variants or self._wants_new_variant(len(variants)):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return random.choice(variants)[0]
+
+    def store(self, user_input, language, context_type, response):
+        """Add a freshly generated response to the variation pool"""
+        key = make_cache_key(user_input, language, context_type)
+        now = time.time()
+        with self._lock:
+            variants = self._exact.setdefault(key, [])
+            if len(variants) >= self.pool_size or any(v[0] == response for v in variants):
+                return
+            variants.append((response, now))
+            if len(self._exact) > MAX_EXACT_KEYS:
+                self._exact.pop(next(iter(self._exact)))
+            self._stores_since_purge += 1
+            purge = self._stores_since_purge >= PURGE_EVERY_N_STORES
+            if purge:
+                self._stores_since_purge = 0
+
+        store = self._store()
+        if store is None:
+            return
+        try:
+            store.add_texts(
+                [normalize_prompt(user_input)],
+                metadatas=[{
+                    "key": key,
+                    "language": language,
+                    "context_type": context_type,
+                    "response": response,
+                    "created": now
+                }]
+            )
+            if purge:
+                self.purge_expired()
+        except Exception as e:
+            print(f"Response cache write failed: {e}")
+
+    def purge_expired(self):
+        """Delete semantic entries older than the TTL"""
+        store = self._store()
+        if store is None:
+            return
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for key in list(self._exact):
+                self._exact[key] = [v for v in self._exact[key] if v[1] >= cutoff]
+                if not self._exact[key]:
+                    del self._exact[key]
+        try:
+            store._collection.delete(where={"created": {"$lt": cutoff}})
+        except Exception as e:
+            print(f"Response cache purge failed: {e}")
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses,
+            'keys': len(self._exact)
+        }
+
+    def _wants_new_variant(self, count):
+        # Probability of generating a new variant shrinks as the pool fills
+        if count >= self.pool_size:
+            return False
+        return random.random() < 1.0 - count / self.pool_size
+
+    def _semantic_lookup(self, user_input, language, context_type, now):
+        store = self._store()
+        if store is None:
+            return []
+        try:
+            results = store.similarity_search_with_relevance_scores(
+                normalize_prompt(user_input),
+                k=self.pool_size,
+                filter={"$and": [{"language": language}, {"context_type": context_type}]}
+            )
+        except Exception as e:
+            print(f"Response cache lookup failed: {e}")
+            return []
+
+        best_key = None
+        variants = []
+        for doc, score in results:
+            metadata = doc.metadata
+            if score < self.threshold or now - metadata.get("created", 0) >= self.ttl:
+                continue
+            # Only serve variants of the single closest prompt
+            if best_key is None:
+                best_key = metadata.get("key")
+            if metadata.get("key") == best_key:
+                variants.append((metadata.get("response", ""), metadata.get("created", now)))
+        return [v for v in variants if v[0]]
+
+
+def _cache_store():
+    from utils.resources import get_response_cache_store
+    return get_response_cache_store()
+
+
+# Global response cache instance
+response_cache = ResponseCache(store_factory=_cache_store)
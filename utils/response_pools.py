@@ -0,0 +1,136 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# -----------------------
+# Response Pool Configuration
+# -----------------------
+POOL_SIZE = int(os.getenv("RESPONSE_POOL_SIZE", "5"))
+# Refill once fewer than this many fresh responses are left
+LOW_WATERMARK = 2
+POOL_MAX_AGE_SECONDS = int(os.getenv("RESPONSE_POOL_MAX_AGE", str(12 * 60 * 60)))
+REFILL_WORKERS = 2
+
+
+class _Pool:
+    __slots__ = ('items',)
+
+    def __init__(self):
+        # [(text, created_at), ...]
+        self.items = []
+
+
+class ResponsePoolManager:
+    """
+    Pre-generated response pools for a bounded set of prompts.
+
+    Each registered (prompt, language, context_type) combination holds up
+    to `pool_size` varied responses. Each response is served once and then
+    removed. Pools are refilled in a small background worker pool when they
+    run low or their responses age out, so serving never waits on the LLM.
+
+    `generator(user_input, language, context_type, count)` must return a
+    list of response texts and raise on failure.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, low_watermark=LOW_WATERMARK,
+                 max_age=POOL_MAX_AGE_SECONDS, workers=REFILL_WORKERS):
+        self.pool_size = pool_size
+        self.low_watermark = low_watermark
+        self.max_age = max_age
+        self.generator = None
+        self._pools = {}
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self.served = 0
+        self.generated = 0
+
+    def register(self, user_input, context_type, languages):
+        """Declare a prompt whose responses should be pooled for the given languages"""
+        with self._lock:
+            for language in languages:
+                self._pools.setdefault((user_input, language, context_type), _Pool())
+
+    def take(self, user_input, language, context_type):
+        """Return a pooled response, or None if the pool is empty or not registered"""
+        key = (user_input, language, context_type)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                return None
+            self._expire(pool)
+            response = None
+            if pool.items:
+                # Random pick so concurrent sessions don't drain the pool in the same order
+                response = pool.items.pop(random.randrange(len(pool.items)))[0]
+                self.served += 1
+            needs_refill = len(pool.items) < self.low_watermark
+        if needs_refill:
+            self._schedule(key)
+        return response
+
+    def warm(self, languages=None):
+        """Start background generation for every pool (optionally only some languages)"""
+        with self._lock:
+            keys = [key for key in self._pools if languages is None or key[1] in languages]
+        for key in keys:
+            self._schedule(key)
+
+    def stats(self):
+        with self._lock:
+            filled = sum(1 for pool in self._pools.values() if pool.items)
+            return {
+                'pools': len(self._pools),
+                'filled': filled,
+                'refilling': len(self._refilling),
+                'served': self.served,
+                'generated': self.generated
+            }
+
+    def _expire(self, pool):
+        cutoff = time.time() - self.max_age
+        if pool.items and pool.items[0][1] < cutoff:
+            pool.items = [item for item in pool.items if item[1] >= cutoff]
+
+    def _schedule(self, key):
+        with self._lock:
+            if self.generator is None or key in self._refilling:
+                return
+            pool = self._pools[key]
+            self._expire(pool)
+            if len(pool.items) >= self.pool_size:
+                return
+            self._refilling.add(key)
+        self._executor.submit(self._refill, key)
+
+    def _refill(self, key):
+        try:
+            with self._lock:
+                pool = self._pools[key]
+                missing = self.pool_size - len(pool.items)
+                existing = {item[0] for item in pool.items}
+            if missing <= 0:
+                return
+            user_input, language, context_type = key
+            responses = self.generator(user_input, language, context_type, missing)
+            now = time.time()
+            with self._lock:
+                for text in responses:
+                    text = (text or "").strip()
+                    if text and text not in existing and len(pool.items) < self.pool_size:
+                        pool.items.append((text, now))
+                        existing.add(text)
+                        self.generated += 1
+        except Exception as e:
+            print(f"Response pool refill failed for {key[2]}/{key[1]}: {e}")
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
+
+
+# Global pool manager instance, shared by every Streamlit session in the process
+response_pools = ResponsePoolManager()
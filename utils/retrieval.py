@@ -0,0 +1,123 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from utils.write_queue import vector_write_queue
+
+
+# -----------------------
+# Retrieval Configuration
+# -----------------------
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+# Retrieval is skipped if it can't finish within this budget
+RETRIEVAL_BUDGET_SECONDS = float(os.getenv("RETRIEVAL_BUDGET_MS", "300")) / 1000
+RETRIEVAL_CACHE_TTL = 300
+MAX_CACHED_QUERIES = 2000
+MAX_SNIPPET_CHARS = 300
+# While recent searches are this much slower than the budget, skip them
+# up front and only probe occasionally
+SLOW_FACTOR = 2.0
+PROBE_INTERVAL_SECONDS = 30
+
+
+class UserContextRetriever:
+    """
+    Fetches a user's most relevant past mood/journal entries for a prompt.
+
+    Searches go to the user's partition and are filtered by the `user`
+    metadata (still needed in the shared and sharded layouts), results are
+    cached per (user, query), and each search runs under a strict latency budget: if it
+    doesn't finish in time the prompt is built without it, and the late
+    result still fills the cache for the next request.
+    """
+
+    def __init__(self, store_factory, k=RETRIEVAL_TOP_K, budget=RETRIEVAL_BUDGET_SECONDS,
+                 cache_ttl=RETRIEVAL_CACHE_TTL, workers=4):
+        self.store_factory = store_factory
+        self.k = k
+        self.budget = budget
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._avg_latency = 0.0
+        self._last_probe = 0.0
+        self.skipped = 0
+        self.timeouts = 0
+
+    def retrieve(self, user_id, query):
+        """Return up to k snippets from the user's own entries ([] if unavailable)"""
+        if not user_id or not query:
+            return []
+        key = (user_id, hashlib.sha256(" ".join(query.lower().split()).encode('utf-8')).hexdigest())
+        now = time.time()
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and now - cached[0] < self.cache_ttl:
+                self._cache.move_to_end(key)
+                return cached[1]
+            if self._avg_latency > self.budget * SLOW_FACTOR and now - self._last_probe < PROBE_INTERVAL_SECONDS:
+                self.skipped += 1
+                return []
+            self._last_probe = now
+
+        future = self._executor.submit(self._search, key, user_id, query)
+        try:
+            return future.result(timeout=self.budget)
+        except TimeoutError:
+            self.timeouts += 1
+            return []
+        except Exception as e:
+            print(f"Context retrieval failed: {e}")
+            return []
+
+    def invalidate(self, user_id):
+        """Drop cached results for a user (called after new entries are written)"""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == user_id]:
+                del self._cache[key]
+
+    def stats(self):
+        return {
+            'cached': len(self._cache),
+            'avg_latency_ms': round(self._avg_latency * 1000, 1),
+            'skipped': self.skipped,
+            'timeouts': self.timeouts
+        }
+
+    def _search(self, key, user_id, query):
+        started = time.time()
+        try:
+            store = self.store_factory(user_id)
+            # No partition yet: the user has nothing stored
+            docs = store.similarity_search(query, k=self.k, filter={"user": user_id}) if store is not None else []
+        finally:
+            elapsed = time.time() - started
+            with self._lock:
+                self._avg_latency = elapsed if not self._avg_latency else 0.8 * self._avg_latency + 0.2 * elapsed
+
+        snippets = [doc.page_content[:MAX_SNIPPET_CHARS] for doc in docs if doc.page_content]
+        with self._lock:
+            self._cache[key] = (time.time(), snippets)
+            while len(self._cache) > MAX_CACHED_QUERIES:
+                self._cache.popitem(last=False)
+        return snippets
+
+
+def _vectorstore(user_id):
+    from utils.partitioning import get_user_vectorstore
+    return get_user_vectorstore(user_id, create=False)
+
+def _invalidate_written(metadatas):
+    for user_id in {metadata.get("user") for metadata in metadatas}:
+        if user_id:
+            user_context_retriever.invalidate(user_id)
+
+
+# Global retriever instance, invalidated whenever the write queue stores entries
+user_context_retriever = UserContextRetriever(store_factory=_vectorstore)
+vector_write_queue.add_listener(_invalidate_written)
@@ -0,0 +1,164 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+# -----------------------
+# Summarizer Configuration
+# -----------------------
+# Number of most recent messages always sent verbatim (3 exchanges)
+KEEP_RECENT_MESSAGES = 6
+# Token budget for the whole "Previous conversation" section of the prompt
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "700"))
+# Long assistant replies are clipped to this many tokens inside the history
+MAX_MESSAGE_TOKENS = 160
+MAX_SUMMARY_WORDS = 120
+MAX_TRACKED_MEMORIES = 1024
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token) without a tokenizer"""
+    return max(1, len(text) // 4) if text else 0
+
+def clip_to_tokens(text, max_tokens):
+    """Clip text to roughly max_tokens, cutting at a word boundary"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    clipped = text[:max_chars].rsplit(' ', 1)[0]
+    return clipped + " …"
+
+def fit_history_to_budget(messages, budget=HISTORY_TOKEN_BUDGET, max_message_tokens=MAX_MESSAGE_TOKENS, summary=None):
+    """
+    Return [(role, content), ...] for the newest messages that fit the budget.
+
+    Each message is clipped first, then the oldest messages are dropped until
+    the section (including any summary) fits in `budget` tokens.
+    """
+    remaining = budget - (estimate_tokens(summary) if summary else 0)
+    fitted = []
+    for msg in reversed(messages):
+        if not (hasattr(msg, 'type') and hasattr(msg, 'content')):
+            continue
+        role = "User" if msg.type == "human" else "Assistant"
+        content = clip_to_tokens(msg.content, max_message_tokens)
+        cost = estimate_tokens(content) + 2
+        if cost > remaining:
+            break
+        fitted.append((role, content))
+        remaining -= cost
+    fitted.reverse()
+    return fitted
+
+
+class _SummaryState:
+    __slots__ = ('summary', 'summarized', 'updating')
+
+    def __init__(self):
+        self.summary = ""
+        # Number of leading messages already folded into the summary
+        self.summarized = 0
+        self.updating = False
+
+
+class RollingSummarizer:
+    """
+    Keeps a compact rolling summary of older turns for each conversation.
+
+    After every exchange, messages that fell out of the verbatim window are
+    folded into the summary by a background LLM call, so the prompt carries
+    a short summary plus the last few messages instead of raw history.
+    Summaries are keyed by user id and hold no reference to the memory.
+    """
+
+    def __init__(self, keep_recent=KEEP_RECENT_MESSAGES, max_tracked=MAX_TRACKED_MEMORIES):
+        self.keep_recent = keep_recent
+        self.max_tracked = max_tracked
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, key, create=False):
+        if key is None:
+            return None
+        with self._lock:
+            state = self._states.get(key)
+            if state is None and create:
+                state = _SummaryState()
+                self._states[key] = state
+                while len(self._states) > self.max_tracked:
+                    self._states.popitem(last=False)
+            if state is not None:
+                self._states.move_to_end(key)
+            return state
+
+    def reset(self, key):
+        """
+        Forget the summary for a conversation. Positions are counted in the
+        in-RAM message list, which no longer lines up once the memory is
+        rebuilt (e.g. reloaded from disk trimmed).
+        """
+        with self._lock:
+            # An update still running keeps writing to the dropped state only
+            self._states.pop(key, None)
+
+    def get_context(self, key, messages):
+        """Return (summary, recent_messages) to place in the prompt"""
+        state = self._state(key)
+        if state is None or state.summarized > len(messages):
+            return "", messages[-self.keep_recent:]
+        recent = messages[state.summarized:][-self.keep_recent:]
+        return state.summary, recent
+
+    def schedule_update(self, key, messages, llm):
+        """Fold messages older than the verbatim window into the summary in the background"""
+        if key is None or llm is None or len(messages) <= self.keep_recent:
+            return
+        state = self._state(key, create=True)
+        with self._lock:
+            if state.updating:
+                return
+            if state.summarized > len(messages):
+                # Memory was cleared; start over
+                state.summary, state.summarized = "", 0
+            fold_until = len(messages) - self.keep_recent
+            if fold_until <= state.summarized:
+                return
+            to_fold = list(messages[state.summarized:fold_until])
+            previous = state.summary
+            state.updating = True
+
+        def _update():
+            try:
+                summary = self._summarize(previous, to_fold, llm)
+                with self._lock:
+                    state.summary = summary
+                    state.summarized = fold_until
+            except Exception as e:
+                print(f"Conversation summary update failed: {e}")
+            finally:
+                state.updating = False
+
+        thread = threading.Thread(target=_update)
+        thread.daemon = True
+        thread.start()
+
+    def _summarize(self, previous, messages, llm):
+        transcript = "\n".join(
+            f"{'User' if msg.type == 'human' else 'Assistant'}: {clip_to_tokens(msg.content, MAX_MESSAGE_TOKENS)}"
+            for msg in messages
+        )
+        prompt = f"""You maintain a running summary of a mental wellness conversation.
+
+Current summary:
+{previous or "(empty)"}
+
+New messages:
+{transcript}
+
+Update the summary in at most {MAX_SUMMARY_WORDS} words. Keep the user's feelings, concerns, preferences and any exercises or advice already given. Write it in the same language as the conversation. Return only the summary."""
+        response = llm.invoke(prompt)
+        return clip_to_tokens(response.content.strip(), MAX_SUMMARY_WORDS * 2)
+
+
+# Global summarizer instance
+conversation_summarizer = RollingSummarizer()
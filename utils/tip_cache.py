@@ -0,0 +1,153 @@
+import datetime
+import threading
+import time
+
+
+# Default lifetime of a cached tip (seconds). A tip is also never served
+# across a calendar-day boundary because the day is part of the key.
+DEFAULT_TIP_TTL = 6 * 60 * 60
+
+# Once an entry is this far into its TTL it is still served, but a background
+# refresh is started so the next visitor gets a fresh tip without waiting.
+REFRESH_AHEAD_RATIO = 0.8
+
+# Sessions waiting on another session's generation give up after this long
+WAIT_TIMEOUT_SECONDS = 30
+
+
+class _TipEntry:
+    __slots__ = ("value", "created_at")
+
+    def __init__(self, value, created_at):
+        self.value = value
+        self.created_at = created_at
+
+
+class DailyTipCache:
+    """
+    Process-wide cache for the daily wellness tip.
+
+    Keys are (language, calendar day, user_id or None). Concurrent sessions
+    asking for the same missing key share a single generation call, and
+    entries close to expiry are refreshed in a background thread while the
+    old value keeps being served.
+    """
+
+    def __init__(self, ttl=DEFAULT_TIP_TTL, refresh_ahead=REFRESH_AHEAD_RATIO, max_entries=256,
+                 wait_timeout=WAIT_TIMEOUT_SECONDS):
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.refresh_ahead = refresh_ahead
+        self.max_entries = max_entries
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(language, user_id=None, day=None):
+        day = day or datetime.date.today()
+        return (language, day.isoformat(), user_id)
+
+    def get(self, key, generate):
+        """
+        Return the tip for `key`, calling `generate()` at most once per key
+        across all threads when the value is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.created_at
+                if age < self.ttl:
+                    if age >= self.ttl * self.refresh_ahead and key not in self._inflight:
+                        self._start_refresh(key, generate)
+                    return entry.value
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._inflight[key] = event
+
+        if not owner:
+            # Another session is already generating this tip
+            if not event.wait(self.wait_timeout):
+                raise TimeoutError("Tip generation in another session is taking too long")
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry.value
+            raise RuntimeError("Tip generation failed in another session")
+
+        try:
+            value = generate()
+            self._store(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def peek(self, key):
+        """Return the cached tip for `key` without generating, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.time() - entry.created_at >= self.ttl:
+            return None
+        return entry.value
+
+    def put(self, key, value):
+        """Store an already generated tip (e.g. from a batched call)"""
+        self._store(key, value)
+
+    def invalidate(self, key=None):
+        """Drop one key, or every cached tip when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'inflight': len(self._inflight)
+            }
+
+    def _start_refresh(self, key, generate):
+        # Caller holds self._lock
+        event = threading.Event()
+        self._inflight[key] = event
+
+        def _refresh():
+            try:
+                self._store(key, generate())
+            except Exception as e:
+                print(f"Tip refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+        thread = threading.Thread(target=_refresh)
+        thread.daemon = True
+        thread.start()
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = _TipEntry(value, time.time())
+            if len(self._entries) > self.max_entries:
+                self._evict_locked()
+
+    def _evict_locked(self):
+        today = datetime.date.today().isoformat()
+        # Drop tips from previous days first, then the oldest ones
+        for stale_key in [k for k in self._entries if k[1] != today]:
+            del self._entries[stale_key]
+        while len(self._entries) > self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k].created_at)
+            del self._entries[oldest]
+
+
+# Global tip cache instance, shared by every Streamlit session in the process
+tip_cache = DailyTipCache()
@@ -0,0 +1,241 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import speech_recognition as sr
+except ImportError:
+    sr = None
+
+
+# -----------------------
+# Voice Input Configuration
+# -----------------------
+# "google" (online), or "sphinx"/"whisper" (local, offline)
+SPEECH_RECOGNIZER = os.getenv("SPEECH_RECOGNIZER", "google")
+# Used when the primary recognizer can't be reached ("" to disable); only
+# for languages it has a model for (see RECOGNIZER_LANGUAGES)
+SPEECH_RECOGNIZER_FALLBACK = os.getenv("SPEECH_RECOGNIZER_FALLBACK", "sphinx")
+CALIBRATION_SECONDS = 1.0
+RECALIBRATION_SECONDS = 0.3
+RECALIBRATE_AFTER_SECONDS = 600
+# A pause this long ends a phrase, which is sent for recognition right away
+PHRASE_PAUSE_SECONDS = 0.5
+# No new phrase within this long after the last one ends the recording
+END_OF_SPEECH_SECONDS = 1.0
+RECOGNITION_WORKERS = 3
+
+SPEECH_LANGUAGE_CODES = {
+    'en': 'en-IN',
+    'hi': 'hi-IN',
+    'mr': 'mr-IN',
+    'es': 'es-ES',
+    'fr': 'fr-FR',
+    'de': 'de-DE'
+}
+
+
+# -----------------------
+# Recognizers
+# -----------------------
+def _recognize_google(recognizer, audio, language):
+    return recognizer.recognize_google(audio, language=language)
+
+def _recognize_sphinx(recognizer, audio, language):
+    # Offline; PocketSphinx ships an English model only
+    return recognizer.recognize_sphinx(audio)
+
+def _recognize_whisper(recognizer, audio, language):
+    # Offline; the local Whisper model detects the language itself
+    return recognizer.recognize_whisper(audio)
+
+RECOGNIZERS = {
+    'google': _recognize_google,
+    'sphinx': _recognize_sphinx,
+    'whisper': _recognize_whisper
+}
+
+# Recognizers limited to some languages (by code prefix); others take any
+RECOGNIZER_LANGUAGES = {
+    'sphinx': ('en',)
+}
+
+def register_recognizer(name, func, languages=None):
+    """Add a recognizer: func(sr.Recognizer, sr.AudioData, language_code) -> text"""
+    RECOGNIZERS[name] = func
+    if languages:
+        RECOGNIZER_LANGUAGES[name] = tuple(languages)
+
+def supports_language(recognizer_name, language_code):
+    """Whether a recognizer has a model for 'en-IN', 'hi-IN', ..."""
+    languages = RECOGNIZER_LANGUAGES.get(recognizer_name)
+    return languages is None or language_code.split('-')[0] in languages
+
+def fallback_for(recognizer_name, fallback_name, language_code):
+    """The fallback recognizer to use for a language, or None"""
+    if not fallback_name or fallback_name == recognizer_name:
+        return None
+    return fallback_name if supports_language(fallback_name, language_code) else None
+
+
+class VoiceCapture:
+    """
+    Handle for one background recording.
+
+    Iterate updates() from the UI thread to get ('listening', '') and
+    ('partial', text) events until the recording is done; then `text`
+    holds the transcript and `error` is None, 'timeout', 'unknown',
+    'request' or 'microphone' (with details in `message`).
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.error = None
+        self.message = ""
+        self._events = queue.Queue()
+        self._phrases = {}
+        self._lock = threading.Lock()
+
+    def updates(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            yield event
+
+    def _emit(self, kind, text=""):
+        self._events.put((kind, text))
+
+    def _phrase_done(self, index, text):
+        # Partial transcript = every phrase recognized so far, in order
+        with self._lock:
+            self._phrases[index] = text
+            ordered = []
+            for i in range(len(self._phrases)):
+                if i not in self._phrases:
+                    break
+                ordered.append(self._phrases[i])
+        self._emit('partial', " ".join(part for part in ordered if part))
+
+    def _finish(self, text="", error=None, message=""):
+        self.text = text
+        self.error = error
+        self.message = message
+        self._events.put(None)
+
+
+class VoiceInputSession:
+    """
+    Long-lived microphone session shared by every voice check-in.
+
+    The ambient-noise calibration is kept between recordings (with the
+    recognizer's dynamic threshold tracking drift) and only refreshed
+    briefly when it is old or a recording heard nothing usable. Audio is
+    captured in a background thread and each phrase is sent to the
+    recognizer as soon as the speaker pauses, so the transcript is ready
+    shortly after they stop talking.
+    """
+
+    def __init__(self, recognizer_name=SPEECH_RECOGNIZER, fallback_name=SPEECH_RECOGNIZER_FALLBACK):
+        self.recognizer_name = recognizer_name
+        self.fallback_name = fallback_name
+        self._recognizer = sr.Recognizer()
+        self._recognizer.dynamic_energy_threshold = True
+        self._recognizer.pause_threshold = PHRASE_PAUSE_SECONDS
+        self._recognizer.non_speaking_duration = min(self._recognizer.non_speaking_duration, PHRASE_PAUSE_SECONDS)
+        self._calibrated_at = 0.0
+        self._needs_recalibration = True
+        # One microphone, so one recording at a time
+        self._mic_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=RECOGNITION_WORKERS)
+        self.recordings = 0
+        self.calibrations = 0
+
+    def start(self, language='en', timeout=5, phrase_time_limit=10):
+        """Begin recording in the background and return a VoiceCapture"""
+        capture = VoiceCapture()
+        thread = threading.Thread(target=self._record, args=(capture, language, timeout, phrase_time_limit))
+        thread.daemon = True
+        thread.start()
+        return capture
+
+    def stats(self):
+        return {
+            'recordings': self.recordings,
+            'calibrations': self.calibrations,
+            'energy_threshold': round(self._recognizer.energy_threshold, 1)
+        }
+
+    def _calibrate(self, source):
+        if not self._needs_recalibration and time.time() - self._calibrated_at < RECALIBRATE_AFTER_SECONDS:
+            return
+        duration = RECALIBRATION_SECONDS if self._calibrated_at else CALIBRATION_SECONDS
+        self._recognizer.adjust_for_ambient_noise(source, duration=duration)
+        self._calibrated_at = time.time()
+        self._needs_recalibration = False
+        self.calibrations += 1
+
+    def _record(self, capture, language, timeout, phrase_time_limit):
+        language_code = SPEECH_LANGUAGE_CODES.get(language, 'en-IN')
+        futures = []
+        try:
+            with self._mic_lock, sr.Microphone() as source:
+                self._calibrate(source)
+                self.recordings += 1
+                capture._emit('listening')
+
+                deadline = time.time() + phrase_time_limit
+                wait = timeout
+                while time.time() < deadline:
+                    try:
+                        audio = self._recognizer.listen(source, timeout=wait, phrase_time_limit=max(deadline - time.time(), 0.5))
+                    except sr.WaitTimeoutError:
+                        break
+                    index = len(futures)
+                    future = self._executor.submit(self._recognize, audio, language_code)
+                    future.add_done_callback(lambda f, i=index: capture._phrase_done(i, f.result() if not f.exception() else ""))
+                    futures.append(future)
+                    wait = END_OF_SPEECH_SECONDS
+        except Exception as e:
+            capture._finish(error='microphone', message=str(e))
+            return
+
+        if not futures:
+            # Heard nothing: the threshold may be off for this room
+            self._needs_recalibration = True
+            capture._finish(error='timeout')
+            return
+
+        texts, request_error = [], None
+        for future in futures:
+            try:
+                texts.append(future.result())
+            except sr.RequestError as e:
+                request_error = e
+            except sr.UnknownValueError:
+                pass
+        text = " ".join(part for part in texts if part).strip()
+        if text:
+            capture._finish(text)
+        elif request_error is not None:
+            capture._finish(error='request', message=str(request_error))
+        else:
+            self._needs_recalibration = True
+            capture._finish(error='unknown')
+
+    def _recognize(self, audio, language_code):
+        try:
+            return RECOGNIZERS[self.recognizer_name](self._recognizer, audio, language_code)
+        except sr.RequestError:
+            fallback = fallback_for(self.recognizer_name, self.fallback_name, language_code)
+            if fallback is None:
+                # Better to report the outage than return English guesses for Hindi speech
+                raise
+            # Service unreachable: use the local recognizer for this phrase
+            return RECOGNIZERS[fallback](self._recognizer, audio, language_code)
+
+
+# Global voice input session (None without speech_recognition)
+voice_input_session = VoiceInputSession() if sr is not None else None
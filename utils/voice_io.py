@@ -1,9 +1,13 @@
 import streamlit as st
 import threading
-import tempfile
-import os
+import queue
+import itertools
+import re
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+from utils.audio_cache import audio_cache
 
 # Global variable to track voice availability
 VOICE_AVAILABLE = False
@@ -18,12 +22,10 @@ except ImportError:
     VOICE_AVAILABLE = False
     print("pyttsx3 not available - voice output disabled")
 
-# Try to import speech recognition
-try:
-    import speech_recognition as sr
-    SPEECH_RECOGNITION_AVAILABLE = True
-except ImportError:
-    SPEECH_RECOGNITION_AVAILABLE = False
+# Speech recognition (the session is None without speech_recognition)
+from utils.voice_input import voice_input_session
+SPEECH_RECOGNITION_AVAILABLE = voice_input_session is not None
+if not SPEECH_RECOGNITION_AVAILABLE:
     print("speech_recognition not available - voice input disabled")
 
 # Try to import advanced TTS options
@@ -36,169 +38,536 @@ except ImportError:
     ADVANCED_TTS_AVAILABLE = False
     print("Advanced TTS features not available")
 
-def speak_text(text, language='en'):
+# -----------------------
+# Text-to-Speech
+# -----------------------
+# translate_tts rejects long requests, and short chunks start playing sooner
+MAX_TTS_CHUNK_CHARS = 180
+# Chunks shorter than this are merged into the previous one
+MIN_TTS_CHUNK_CHARS = 40
+TTS_SYNTHESIS_WORKERS = 3
+# Chunks of one utterance synthesized ahead of playback
+TTS_LOOKAHEAD_CHUNKS = TTS_SYNTHESIS_WORKERS * 2
+# Utterances waiting to be spoken; new ones are dropped when it's full
+TTS_QUEUE_SIZE = 8
+# Utterances that waited longer than this are stale and skipped
+TTS_MAX_QUEUE_AGE_SECONDS = 60
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+GOOGLE_TTS_LANG_CODES = {
+    'en': 'en',  # English
+    'hi': 'hi',  # Hindi
+    'mr': 'mr',  # Marathi
+    'es': 'es',  # Spanish
+    'fr': 'fr',  # French
+    'de': 'de'   # German
+}
+
+# Sentence ends, including the Devanagari danda (।) and double danda (॥)
+_SENTENCE_END = re.compile(r'(?<=[.!?।॥…])\s+|\n+')
+_CLAUSE_END = re.compile(r'(?<=[,;:،])\s+')
+_WHITESPACE = re.compile(r'\s+')
+# Markdown symbols and list markers that TTS engines would read aloud
+_MARKDOWN = re.compile(r'[*#_`>|]+|^\s*(?:\d+[.)]|[-•])(?:\s+|$)', re.MULTILINE)
+
+_synthesis_executor = ThreadPoolExecutor(max_workers=TTS_SYNTHESIS_WORKERS)
+# Submitted chunks that have not finished synthesizing yet
+_synthesis_pending = 0
+_synthesis_lock = threading.Lock()
+# Reuses HTTP connections to the TTS endpoint across chunks
+_http = requests.Session() if ADVANCED_TTS_AVAILABLE else None
+
+
+def _split_long(sentence, max_chars):
+    """Split an over-long sentence at clause boundaries, then between words"""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    pieces = []
+    current = ""
+    for part in _CLAUSE_END.split(sentence):
+        words = part.split() if len(part) > max_chars else [part]
+        for word in words:
+            while len(word) > max_chars:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(word[:max_chars])
+                word = word[max_chars:]
+            if current and len(current) + 1 + len(word) > max_chars:
+                pieces.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _submit_synthesis(text, language):
+    global _synthesis_pending
+    with _synthesis_lock:
+        _synthesis_pending += 1
+    future = _synthesis_executor.submit(_synthesize_chunk, text, language)
+    future.add_done_callback(_synthesis_done)
+    return future
+
+def _synthesis_done(future):
+    global _synthesis_pending
+    with _synthesis_lock:
+        _synthesis_pending -= 1
+
+def synthesis_backlog():
+    """Number of chunks queued for or in synthesis"""
+    with _synthesis_lock:
+        return _synthesis_pending
+
+def split_sentences(text, max_chars=MAX_TTS_CHUNK_CHARS):
+    """Split text into sentence-sized chunks of at most `max_chars` for TTS"""
+    chunks = []
+    for sentence in _SENTENCE_END.split(_MARKDOWN.sub(' ', text)):
+        sentence = " ".join(sentence.split())
+        if not any(char.isalnum() for char in sentence):
+            continue
+        for piece in _split_long(sentence, max_chars):
+            if chunks and len(piece) < MIN_TTS_CHUNK_CHARS and len(chunks[-1]) + 1 + len(piece) <= max_chars // 2:
+                chunks[-1] = f"{chunks[-1]} {piece}"
+            else:
+                chunks.append(piece)
+    return chunks
+
+
+class SentenceStream:
     """
-    Convert text to speech with multilingual support
-    Uses Google TTS for multilingual support, falls back to pyttsx3
+    Turns streamed LLM text into TTS chunks as soon as each sentence is complete.
+
+    Call feed() with each piece of streamed text and close() at the end;
+    every complete chunk is handed straight to the utterance for synthesis.
     """
-    if not VOICE_AVAILABLE:
-        return
-    
-    def _speak():
+
+    def __init__(self, utterance, max_chars=MAX_TTS_CHUNK_CHARS):
+        self.utterance = utterance
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._closed = False
+
+    def feed(self, text):
+        if self._closed or not text:
+            return
+        self._buffer += text
+        boundary = None
+        for boundary in _SENTENCE_END.finditer(self._buffer):
+            pass
+        if boundary is not None:
+            complete, self._buffer = self._buffer[:boundary.start()], self._buffer[boundary.end():]
+            self._emit(split_sentences(complete, self.max_chars))
+        elif len(self._buffer) > self.max_chars:
+            # A very long sentence: speak up to the last clause break (or the
+            # last space), keeping the raw tail so later text joins it as sent
+            split_at = 0
+            for match in _CLAUSE_END.finditer(self._buffer):
+                split_at = match.end()
+            if len(self._buffer) - split_at > self.max_chars:
+                for match in _WHITESPACE.finditer(self._buffer):
+                    split_at = match.end()
+            if split_at:
+                complete, self._buffer = self._buffer[:split_at], self._buffer[split_at:]
+                self._emit(split_sentences(complete, self.max_chars))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._emit(split_sentences(self._buffer, self.max_chars))
+        self._buffer = ""
+        self.utterance.finish()
+
+    def _emit(self, chunks):
+        for chunk in chunks:
+            self.utterance.add(chunk)
+
+
+class _Chunk:
+    __slots__ = ('text', 'future')
+
+    def __init__(self, text):
+        self.text = text
+        self.future = None
+
+
+class Utterance:
+    """
+    One response to be spoken: an ordered queue of chunks.
+
+    With pygame, at most `lookahead` chunks are synthesized ahead of
+    playback; a slot is freed when a chunk has been played or discarded.
+    The worker plays the resulting files in order. Without pygame, the
+    worker speaks the chunk text with pyttsx3.
+    """
+
+    def __init__(self, language, priority, lookahead=TTS_LOOKAHEAD_CHUNKS):
+        self.language = language
+        self.priority = priority
+        self.created = time.time()
+        self.epoch = 0
+        self._items = queue.Queue()
+        self._cancelled = threading.Event()
+        self._unsubmitted = deque()
+        self._slots = threading.Semaphore(lookahead)
+        self._submit_lock = threading.Lock()
+
+    def add(self, text):
+        if self._cancelled.is_set():
+            return
+        chunk = _Chunk(text)
+        if ADVANCED_TTS_AVAILABLE:
+            with self._submit_lock:
+                self._unsubmitted.append(chunk)
+            self._submit_ready()
+        self._items.put(chunk)
+
+    def done_with(self, chunk):
+        """Free the lookahead slot of a chunk that was played"""
+        if chunk.future is not None:
+            self._slots.release()
+            self._submit_ready()
+
+    def _submit_ready(self):
+        # Chunks are submitted in order, so the one played next is always submitted
+        with self._submit_lock:
+            while self._unsubmitted and not self.cancelled and self._slots.acquire(blocking=False):
+                chunk = self._unsubmitted.popleft()
+                chunk.future = _submit_synthesis(chunk.text, self.language)
+
+    def finish(self):
+        self._items.put(None)
+
+    def cancel(self):
+        self._cancelled.set()
+        self._discard()
+        self._items.put(None)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def next_item(self):
+        """Next chunk; None once finished or cancelled"""
+        while not self.cancelled:
+            try:
+                item = self._items.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is None or self.cancelled:
+                break
+            return item
+        self._discard()
+        return None
+
+    def _discard(self):
+        # Don't spend synthesis on chunks nobody will hear
+        with self._submit_lock:
+            self._unsubmitted.clear()
+        while True:
+            try:
+                item = self._items.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item.future is not None:
+                item.future.cancel()
+                self._slots.release()
+
+
+class TTSWorker:
+    """
+    The single long-lived thread that plays all speech.
+
+    Utterances wait in a bounded priority queue (lower number first, FIFO
+    within a priority). The pygame mixer and the pyttsx3 engine are set up
+    once, so overlapping requests never race on the audio device. By
+    default a new utterance preempts the one playing and any still queued,
+    since an older response is stale once a new one arrives. cancel_all
+    bumps an epoch, so an utterance already taken off the queue but not
+    yet playing is skipped as well.
+    """
+
+    def __init__(self, max_queue=TTS_QUEUE_SIZE, max_age=TTS_MAX_QUEUE_AGE_SECONDS):
+        self.max_age = max_age
+        self._queue = queue.PriorityQueue(maxsize=max_queue)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._current = None
+        self._epoch = 0
+        self.spoken = 0
+        self.cancelled = 0
+        self.dropped = 0
+
+    def submit(self, language, priority=PRIORITY_NORMAL, preempt=True):
+        """Queue a new utterance and return it (add chunks, then finish())"""
+        utterance = Utterance(language, priority)
+        self._ensure_thread()
+        if preempt:
+            self.cancel_all()
+        with self._lock:
+            utterance.epoch = self._epoch
         try:
-            # Try Google TTS first for better multilingual support
-            if ADVANCED_TTS_AVAILABLE:
-                _google_tts(text, language)
-            else:
-                # Fallback to pyttsx3
-                _pyttsx3_tts(text, language)
-                
-        except Exception as e:
-            print(f"TTS Error: {e}")
-            # Final fallback
+            self._queue.put_nowait((priority, next(self._sequence), utterance))
+        except queue.Full:
+            print("TTS queue full - utterance dropped")
+            with self._lock:
+                self.dropped += 1
+            utterance.cancel()
+        return utterance
+
+    def cancel_all(self):
+        """Stop the current utterance and drop everything queued"""
+        with self._lock:
+            self._epoch += 1
+            current = self._current
+            if current is not None and not current.cancelled:
+                current.cancel()
+                self.cancelled += 1
+            while True:
+                try:
+                    _, _, utterance = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+                utterance.cancel()
+                self.cancelled += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'speaking': self._current is not None,
+                'spoken': self.spoken,
+                'cancelled': self.cancelled,
+                'dropped': self.dropped,
+                'synthesis_backlog': synthesis_backlog()
+            }
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            _, _, utterance = self._queue.get()
+            with self._lock:
+                # Cancelled by a cancel_all that ran after the dequeue
+                stale = utterance.epoch != self._epoch or time.time() - utterance.created > self.max_age
+                if stale and not utterance.cancelled:
+                    utterance.cancel()
+                    self.cancelled += 1
+                if utterance.cancelled:
+                    continue
+                self._current = utterance
             try:
-                _pyttsx3_tts(text, language)
-            except:
-                print("All TTS methods failed")
+                self._speak(utterance)
+                with self._lock:
+                    if not utterance.cancelled:
+                        self.spoken += 1
+            finally:
+                with self._lock:
+                    self._current = None
 
-    # Run in separate thread to avoid blocking
-    thread = threading.Thread(target=_speak)
-    thread.daemon = True
-    thread.start()
+    def _speak(self, utterance):
+        while True:
+            chunk = utterance.next_item()
+            if chunk is None:
+                return
+            try:
+                if ADVANCED_TTS_AVAILABLE:
+                    _play_audio_file(chunk.future.result(), utterance)
+                else:
+                    # Without pygame, pyttsx3 speaks each chunk directly
+                    _run_pyttsx3(_pyttsx3_speak, chunk.text, utterance.language)
+            except Exception as e:
+                print(f"TTS Error: {e}")
+            finally:
+                utterance.done_with(chunk)
 
-def _google_tts(text, language='en'):
-    """Use Google Translate TTS for multilingual support"""
+
+def speak_text(text, language='en', priority=PRIORITY_NORMAL, preempt=True):
+    """
+    Convert text to speech with multilingual support
+    Uses Google TTS for multilingual support, falls back to pyttsx3.
+    The text is spoken sentence by sentence, starting as soon as the
+    first sentence is synthesized. Returns the queued Utterance.
+    """
+    if not VOICE_AVAILABLE:
+        return None
+    utterance = tts_worker.submit(language, priority, preempt)
+    for chunk in split_sentences(text):
+        utterance.add(chunk)
+    utterance.finish()
+    return utterance
+
+def speak_stream(language='en', priority=PRIORITY_NORMAL, preempt=True):
+    """
+    Speak a response while it is still streaming.
+
+    Returns a SentenceStream to feed() streamed text into and close() at
+    the end, or None if voice output is unavailable.
+    """
+    if not VOICE_AVAILABLE:
+        return None
+    return SentenceStream(tts_worker.submit(language, priority, preempt))
+
+def _synthesize_chunk(text, language):
+    """Return an audio file for one chunk: Google TTS first, pyttsx3 as fallback"""
     try:
-        # Language codes for Google TTS
-        lang_codes = {
-            'en': 'en',  # English
-            'hi': 'hi',  # Hindi
-            'mr': 'mr',  # Marathi
-            'es': 'es',  # Spanish
-            'fr': 'fr',  # French
-            'de': 'de'   # German
-        }
-        
-        lang_code = lang_codes.get(language, 'en')
-        
-        # URL encode the text
-        encoded_text = urllib.parse.quote(text)
-        
-        # Google TTS URL
-        url = f"https://translate.google.com/translate_tts?ie=UTF-8&client=tw-ob&tl={lang_code}&q={encoded_text}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            # Save to temporary file and play
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmpfile:
-                tmpfile.write(response.content)
-                tmpfile.flush()
-                tmpfile_path = tmpfile.name
-            
-            pygame.mixer.init()
-            pygame.mixer.music.load(tmpfile_path)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-            
-            pygame.mixer.quit()
-            os.unlink(tmpfile_path)
-        else:
-            raise Exception(f"Google TTS request failed with status {response.status_code}")
-            
+        return _google_tts_file(text, language)
     except Exception as e:
         print(f"Google TTS failed: {e}")
-        # Fallback to pyttsx3
-        _pyttsx3_tts(text, language)
+        return _run_pyttsx3(_pyttsx3_tts_file, text, language)
 
-def _pyttsx3_tts(text, language='en'):
-    """Fallback TTS using pyttsx3"""
-    try:
+def _google_tts_file(text, language='en'):
+    """Use Google Translate TTS for multilingual support; returns the cached MP3 path"""
+    lang_code = GOOGLE_TTS_LANG_CODES.get(language, 'en')
+    
+    # Replay identical utterances from the audio cache
+    cache_key = audio_cache.make_key(text, lang_code, 'google')
+    cached_path = audio_cache.get(cache_key, '.mp3')
+    if cached_path:
+        return cached_path
+    
+    # URL encode the text
+    encoded_text = urllib.parse.quote(text)
+    
+    # Google TTS URL
+    url = f"https://translate.google.com/translate_tts?ie=UTF-8&client=tw-ob&tl={lang_code}&q={encoded_text}"
+    
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    
+    response = _http.get(url, headers=headers, timeout=10)
+    if response.status_code != 200:
+        raise Exception(f"Google TTS request failed with status {response.status_code}")
+    
+    # Keep the audio so replays skip the download
+    return audio_cache.put_bytes(cache_key, '.mp3', response.content)
+
+_mixer_ready = False
+
+def _play_audio_file(path, utterance=None):
+    """Play an audio file with pygame and wait for it to finish (or the utterance to be cancelled)"""
+    global _mixer_ready
+    # Only the TTS worker thread plays audio, so the mixer is set up once
+    if not _mixer_ready:
+        pygame.mixer.init()
+        _mixer_ready = True
+    pygame.mixer.music.load(path)
+    pygame.mixer.music.set_volume(voice_settings.volume)
+    pygame.mixer.music.play()
+    
+    # Wait for playback to finish
+    while pygame.mixer.music.get_busy():
+        if utterance is not None and utterance.cancelled:
+            pygame.mixer.music.stop()
+            break
+        time.sleep(0.05)
+
+# -----------------------
+# pyttsx3 (single engine on a dedicated thread)
+# -----------------------
+# pyttsx3 engines are tied to the thread that created them, so all
+# pyttsx3 calls run on this one thread
+_pyttsx3_executor = ThreadPoolExecutor(max_workers=1)
+_pyttsx3_state = {'engine': None, 'voices': {}}
+
+PYTTSX3_VOICE_PREFERENCES = {
+    'hi': ['india', 'hindi'],
+    'mr': ['india', 'marathi'],
+    'es': ['spanish', 'mexican'],
+    'fr': ['french', 'france'],
+    'de': ['german', 'deutsch']
+}
+
+def _run_pyttsx3(func, text, language):
+    return _pyttsx3_executor.submit(func, text, language).result()
+
+def _pyttsx3_engine(language='en'):
+    """Return the shared pyttsx3 engine configured for the language"""
+    if _pyttsx3_state['engine'] is None:
         engine = pyttsx3.init()
-        
-        # Configure voice properties
-        engine.setProperty('rate', 150)  # Speaking speed
-        engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
-        
-        # Try to find appropriate voice for language
+        # Resolve the voice for every language with a single voice scan
         voices = engine.getProperty('voices')
-        
-        # Voice selection based on language
-        voice_preferences = {
-            'hi': ['india', 'hindi'],
-            'mr': ['india', 'marathi'],
-            'es': ['spanish', 'mexican'],
-            'fr': ['french', 'france'],
-            'de': ['german', 'deutsch']
-        }
-        
-        target_keywords = voice_preferences.get(language, ['english'])
-        
-        # Find matching voice
-        for voice in voices:
-            voice_name = voice.name.lower()
-            if any(keyword in voice_name for keyword in target_keywords):
-                engine.setProperty('voice', voice.id)
-                break
-        else:
+        for lang in list(PYTTSX3_VOICE_PREFERENCES) + ['en']:
+            target_keywords = PYTTSX3_VOICE_PREFERENCES.get(lang, ['english'])
+            match = next((voice for voice in voices if any(keyword in voice.name.lower() for keyword in target_keywords)), None)
             # Use default voice if no match found
-            if voices:
-                engine.setProperty('voice', voices[0].id)
-        
-        engine.say(text)
-        engine.runAndWait()
-        
-    except Exception as e:
-        print(f"pyttsx3 TTS failed: {e}")
-        raise
+            match = match or (voices[0] if voices else None)
+            if match is not None:
+                _pyttsx3_state['voices'][lang] = match.id
+        _pyttsx3_state['engine'] = engine
+    
+    engine = _pyttsx3_state['engine']
+    # Configure voice properties
+    engine.setProperty('rate', voice_settings.rate)  # Speaking speed
+    engine.setProperty('volume', voice_settings.volume)  # Volume (0.0 to 1.0)
+    voice_id = _pyttsx3_state['voices'].get(language, _pyttsx3_state['voices'].get('en'))
+    if voice_id:
+        engine.setProperty('voice', voice_id)
+    return engine
+
+def _pyttsx3_tts_file(text, language='en'):
+    """Fallback TTS: synthesize with pyttsx3 into the audio cache and return the WAV path"""
+    cache_key = audio_cache.make_key(text, language, 'pyttsx3', voice_settings.rate)
+    cached_path = audio_cache.get(cache_key, '.wav')
+    if cached_path:
+        return cached_path
+    
+    engine = _pyttsx3_engine(language)
+    tmp_path = audio_cache.temp_path(cache_key, '.wav')
+    engine.save_to_file(text, tmp_path)
+    engine.runAndWait()
+    return audio_cache.commit(tmp_path, cache_key, '.wav')
+
+def _pyttsx3_speak(text, language='en'):
+    """Speak directly with pyttsx3 (used when pygame is unavailable)"""
+    engine = _pyttsx3_engine(language)
+    engine.say(text)
+    engine.runAndWait()
 
-def record_voice(timeout=5, phrase_time_limit=10):
+def record_voice(timeout=5, phrase_time_limit=10, language='en'):
     """
     Record voice input and convert to text
+    Uses the shared voice input session (calibration is reused and each
+    phrase is transcribed while the user keeps talking).
     Returns: transcribed text or empty string if failed
     """
     if not SPEECH_RECOGNITION_AVAILABLE:
         st.warning("Speech recognition not available. Please install speech_recognition and PyAudio.")
         return ""
     
-    try:
-        recognizer = sr.Recognizer()
-        
-        with sr.Microphone() as source:
-            # Adjust for ambient noise
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            
-            st.info("🎤 Listening... Speak now")
-            
-            try:
-                # Listen for audio with timeout
-                audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-                
-                # Recognize speech using Google's speech recognition
-                text = recognizer.recognize_google(audio)
-                return text
-                
-            except sr.WaitTimeoutError:
-                st.warning("No speech detected. Please try again.")
-                return ""
-            except sr.UnknownValueError:
-                st.warning("Could not understand the audio. Please try again.")
-                return ""
-            except sr.RequestError as e:
-                st.warning(f"Speech recognition service error: {e}")
-                return ""
-                
-    except Exception as e:
-        st.warning(f"Microphone access unavailable: {str(e)}")
+    capture = voice_input_session.start(language, timeout=timeout, phrase_time_limit=phrase_time_limit)
+    
+    # Streamlit calls must stay on this thread, so show progress from here
+    status = st.empty()
+    for event, text in capture.updates():
+        if event == 'listening':
+            status.info("🎤 Listening... Speak now")
+        elif event == 'partial' and text:
+            status.info(f"🎤 {text}")
+    status.empty()
+    
+    if capture.error == 'timeout':
+        st.warning("No speech detected. Please try again.")
+    elif capture.error == 'unknown':
+        st.warning("Could not understand the audio. Please try again.")
+    elif capture.error == 'request':
+        st.warning(f"Speech recognition service error: {capture.message}")
+    elif capture.error == 'microphone':
+        st.warning(f"Microphone access unavailable: {capture.message}")
         st.info("Please use text input instead.")
-        return ""
+    return capture.text
 
 def get_voice_status():
     """Return voice system status"""
@@ -218,7 +587,7 @@ def test_voice_system():
     
     # Test voice output
     try:
-        speak_text("Voice test completed successfully")
+        speak_text("Voice test completed successfully", priority=PRIORITY_LOW, preempt=False)
         results['output'] = True
     except Exception as e:
         results['message'] += f"Output failed: {e}. "
@@ -254,6 +623,9 @@ class VoiceSettings:
 # Global voice settings instance
 voice_settings = VoiceSettings()
 
+# Global TTS worker instance; the one thread that plays speech
+tts_worker = TTSWorker()
+
 def setup_voice_controls():
     """Setup voice controls for Streamlit sidebar"""
     with st.sidebar:
@@ -0,0 +1,246 @@
+import atexit
+import hashlib
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from utils.embedding_cache import normalize_text
+
+
+# -----------------------
+# Write Queue Configuration
+# -----------------------
+MAX_BATCH_SIZE = 32
+MAX_BATCH_WAIT_SECONDS = 2.0
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 1.0
+MAX_PENDING = 5000
+DRAIN_TIMEOUT_SECONDS = 10.0
+# Identical entries from the same user within one bucket share a document id
+DEDUP_BUCKET_SECONDS = int(os.getenv("VECTOR_DEDUP_BUCKET", str(24 * 60 * 60)))
+# Repeats of an id seen this recently are dropped before any embedding call
+DEDUP_WINDOW_SECONDS = int(os.getenv("VECTOR_DEDUP_WINDOW", "3600"))
+MAX_RECENT_IDS = 10000
+
+
+def entry_id(user_id, entry_type, text, created=None, bucket=DEDUP_BUCKET_SECONDS):
+    """Deterministic document id from (user, type, normalized content, time bucket)"""
+    content = hashlib.sha256(normalize_text(text).lower().encode('utf-8')).hexdigest()
+    bucket_index = int((created if created is not None else time.time()) // bucket)
+    raw = f"{user_id}\0{entry_type}\0{content}\0{bucket_index}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+class _WriteItem:
+    __slots__ = ('text', 'metadata', 'doc_id')
+
+    def __init__(self, text, metadata, doc_id):
+        self.text = text
+        self.metadata = metadata
+        self.doc_id = doc_id
+
+
+class VectorWriteQueue:
+    """
+    Write-behind queue for vectorstore.add_texts.
+
+    Entries are accepted immediately and written by a single background
+    worker in batches (up to `max_batch` entries or `max_wait` seconds),
+    so each batch costs one embedding call and one Chroma write. Failed
+    batches are retried with backoff, and pending entries are drained at
+    interpreter shutdown.
+
+    Entries with `user` and `type` metadata get a deterministic id (see
+    `entry_id`), so writes are upserts, and repeats seen within
+    `dedup_window` seconds are suppressed without being embedded again.
+
+    Batches are split by `partition_key(metadata)` (the Chroma collection
+    the entry belongs to), so users sharing a collection share one write.
+    `store_factory(user_id)` returns the vectorstore for an entry's user.
+    """
+
+    def __init__(self, store_factory, max_batch=MAX_BATCH_SIZE, max_wait=MAX_BATCH_WAIT_SECONDS,
+                 max_retries=MAX_RETRIES, max_pending=MAX_PENDING, dedup_window=DEDUP_WINDOW_SECONDS):
+        self.store_factory = store_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.dedup_window = dedup_window
+        self._recent_ids = OrderedDict()
+        self._recent_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._listeners = []
+        self.partition_key = _collection_key
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.suppressed = 0
+
+    def enqueue(self, text, metadata=None, doc_id=None):
+        """Queue one entry; returns False if the queue is full"""
+        metadata = metadata or {}
+        if doc_id is None and metadata.get("user") and metadata.get("type"):
+            doc_id = entry_id(metadata["user"], metadata["type"], text, metadata.get("ts"))
+        if doc_id is not None and self._seen_recently(doc_id):
+            # Already saved; the caller sees the same outcome as a new write
+            self.suppressed += 1
+            return True
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(_WriteItem(text, metadata, doc_id))
+            return True
+        except queue.Full:
+            print("Vector write queue full - entry dropped")
+            self.failed += 1
+            self._forget_id(doc_id)
+            return False
+
+    def add_listener(self, callback):
+        """Call `callback(metadatas)` after each batch is written"""
+        self._listeners.append(callback)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            'pending': self.pending(),
+            'written': self.written,
+            'failed': self.failed,
+            'batches': self.batches,
+            'suppressed': self.suppressed
+        }
+
+    def drain(self, timeout=DRAIN_TIMEOUT_SECONDS):
+        """Flush everything still queued and stop the worker"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def _seen_recently(self, doc_id):
+        """Record `doc_id` and report whether it was already seen inside the window"""
+        now = time.time()
+        with self._recent_lock:
+            seen = self._recent_ids.get(doc_id)
+            if seen is not None and now - seen < self.dedup_window:
+                return True
+            self._recent_ids[doc_id] = now
+            self._recent_ids.move_to_end(doc_id)
+            while len(self._recent_ids) > MAX_RECENT_IDS:
+                self._recent_ids.popitem(last=False)
+            return False
+
+    def _forget_id(self, doc_id):
+        # A failed write must not suppress the user's retry
+        if doc_id is not None:
+            with self._recent_lock:
+                self._recent_ids.pop(doc_id, None)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run)
+            self._worker.daemon = True
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            elif self._stop.is_set():
+                return
+
+    def _next_batch(self):
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            # When draining, take whatever is already queued without waiting
+            remaining = 0 if self._stop.is_set() else deadline - time.time()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        # Entries may belong to different collections (see utils.partitioning);
+        # each collection gets one batched write
+        groups = {}
+        for item in batch:
+            groups.setdefault(self.partition_key(item.metadata), []).append(item)
+        for items in groups.values():
+            # Every user in a group maps to the same collection
+            self._write_partition(items[0].metadata.get("user"), items)
+
+    def _write_partition(self, user_id, batch):
+        # Chroma rejects repeated ids within one upsert; keep the latest copy
+        unique = OrderedDict()
+        for item in batch:
+            key = item.doc_id if item.doc_id is not None else id(item)
+            unique.pop(key, None)
+            unique[key] = item
+        batch = list(unique.values())
+        texts = [item.text for item in batch]
+        metadatas = [item.metadata for item in batch]
+        ids = [item.doc_id for item in batch]
+        if any(doc_id is None for doc_id in ids):
+            ids = None
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                store = self.store_factory(user_id)
+                # One batched embedding call and one Chroma write per batch;
+                # with ids, add_texts upserts so rewrites replace the old copy
+                store.add_texts(texts, metadatas=metadatas, ids=ids)
+                self.written += len(batch)
+                self.batches += 1
+                self._notify(metadatas)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Vector write failed after {attempt + 1} attempts, {len(batch)} entries dropped: {e}")
+                    self.failed += len(batch)
+                    for item in batch:
+                        self._forget_id(item.doc_id)
+                    return
+                time.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+    def _notify(self, metadatas):
+        for callback in self._listeners:
+            try:
+                callback(metadatas)
+            except Exception as e:
+                print(f"Vector write listener failed: {e}")
+
+
+def _collection_key(metadata):
+    from utils.partitioning import collection_name_for
+    return collection_name_for(metadata.get("user"))
+
+def _vectorstore(user_id=None):
+    from utils.partitioning import get_user_vectorstore
+    return get_user_vectorstore(user_id)
+
+
+# Global write queue instance, drained when the process exits
+vector_write_queue = VectorWriteQueue(store_factory=_vectorstore)
+atexit.register(vector_write_queue.drain)